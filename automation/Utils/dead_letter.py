@@ -0,0 +1,68 @@
+import os
+import json
+import time
+import logging
+import threading
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+
+class DeadLetterQueue:
+    """Persistent JSON-lines queue of instructor URLs deferred while the API was unavailable.
+
+    Entries survive restarts; each URL is kept once (the latest failure wins).
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _read(self) -> List[dict]:
+        if not os.path.exists(self.path):
+            return []
+        entries = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    logger.warning(f"Ignoring corrupt dead-letter entry: {line[:200]}")
+        return entries
+
+    def _write(self, entries: List[dict]) -> None:
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+        os.replace(temp_path, self.path)
+
+    def push(self, url: str, stage: str, reason: str, username: str = "", email: str = "") -> None:
+        entry = {
+            "url": url,
+            "stage": stage,
+            "reason": reason,
+            "username": username,
+            "email": email,
+            "deferred_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        with self._lock:
+            entries = [item for item in self._read() if item.get("url") != url]
+            entries.append(entry)
+            self._write(entries)
+        logger.warning(f"Deferred {username or url} to dead-letter queue at stage '{stage}': {reason}")
+
+    def pop_all(self) -> List[dict]:
+        """Remove and return every queued entry (callers re-queue anything that fails again)."""
+        with self._lock:
+            entries = self._read()
+            if entries:
+                self._write([])
+            return entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._read())
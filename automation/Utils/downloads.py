@@ -0,0 +1,229 @@
+import os
+import re
+import logging
+import threading
+import requests
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from typing import Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROBE_TIMEOUT = 15
+DOWNLOAD_TIMEOUT = 60
+DEFAULT_DOWNLOAD_WORKERS = 4
+CHUNK_SIZE = 256 * 1024
+# Markers of the Enrollware sign-in page served (with status 200) when the session is gone.
+LOGIN_PAGE_MARKERS = ("loginbutton", "name=\"password\"", "id=\"password\"")
+ENROLLWARE_HOST = "enrollware.com"
+
+
+def get_max_upload_bytes() -> Optional[int]:
+    """Server upload limit from MAX_UPLOAD_SIZE_MB, or None when no limit is configured."""
+    raw = str(os.getenv("MAX_UPLOAD_SIZE_MB") or "").strip()
+    if not raw:
+        return None
+    try:
+        return int(float(raw) * 1024 * 1024)
+    except ValueError:
+        logger.warning(f"Ignoring invalid MAX_UPLOAD_SIZE_MB value: {raw}")
+        return None
+
+
+def get_download_workers() -> int:
+    """Concurrent document downloads from DOWNLOAD_WORKERS (default 4)."""
+    raw = str(os.getenv("DOWNLOAD_WORKERS") or "").strip()
+    if not raw:
+        return DEFAULT_DOWNLOAD_WORKERS
+    try:
+        return max(1, int(raw))
+    except ValueError:
+        logger.warning(f"Ignoring invalid DOWNLOAD_WORKERS value: {raw}")
+        return DEFAULT_DOWNLOAD_WORKERS
+
+
+def _is_enrollware_host(url: str) -> bool:
+    host = (urlsplit(url).hostname or "").lower()
+    return host == ENROLLWARE_HOST or host.endswith("." + ENROLLWARE_HOST)
+
+
+def is_login_response(response) -> bool:
+    """True if ``response`` is the Enrollware sign-in page instead of the requested resource.
+
+    That is a redirect that ended on the Enrollware login page, or an HTML body carrying the
+    login form. A plain 401/403 (e.g. an expired signed URL on another host) is an ordinary
+    download failure and must not trigger a browser re-login.
+    """
+    if response.history and _is_enrollware_host(response.url) and "login" in urlsplit(response.url).path.lower():
+        return True
+    if response.request.method == "HEAD" or "text/html" not in response.headers.get("Content-Type", "").lower():
+        return False
+    # Documents are never expected to be HTML, so reading the (small) page body is cheap;
+    # requests replays the cached body if the caller streams it afterwards.
+    text = response.content[:65536].decode("utf-8", "ignore").lower()
+    return any(marker in text for marker in LOGIN_PAGE_MARKERS)
+
+
+class DownloadSession:
+    """requests.Session that shares the browser's authenticated Enrollware session.
+
+    Cookies and the user agent are copied from the WebDriver, connections are kept
+    alive in a pool sized for concurrent transfers, and a response that turns out to
+    be the login page triggers a cookie refresh from the browser (and, if that is not
+    enough, a browser re-login) before the request is retried.
+    """
+
+    def __init__(self, driver_manager, pool_size: int = DEFAULT_DOWNLOAD_WORKERS, timeout: int = DOWNLOAD_TIMEOUT) -> None:
+        self.driver_manager = driver_manager
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.refreshes = 0
+        self._generation = 0
+        # WebDriver is not thread-safe; only one transfer thread talks to it at a time.
+        self._lock = threading.Lock()
+        self.refresh_cookies()
+
+    def refresh_cookies(self) -> None:
+        driver = self.driver_manager.driver
+        cookies = driver.get_cookies()
+        self.session.cookies.clear()
+        for cookie in cookies:
+            self.session.cookies.set(
+                cookie["name"], cookie["value"], domain=cookie.get("domain"), path=cookie.get("path", "/")
+            )
+        self.session.headers["User-Agent"] = driver.execute_script("return navigator.userAgent")
+        self._generation += 1
+
+    def _reauthenticate(self, generation: int, relogin: bool) -> None:
+        with self._lock:
+            if generation != self._generation:
+                return  # another transfer already refreshed the session
+            self.refreshes += 1
+            relogin_callback = self.driver_manager.relogin
+            if relogin and relogin_callback:
+                logger.warning("Enrollware session expired; logging the browser in again")
+                relogin_callback(self.driver_manager.driver)
+                if self.driver_manager.current_url:
+                    self.driver_manager.driver.get(self.driver_manager.current_url)
+            else:
+                logger.info("Download hit the login page; refreshing cookies from the browser")
+            self.refresh_cookies()
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request, retrying after a cookie refresh and then a re-login if it lands on the login page."""
+        kwargs.setdefault("timeout", self.timeout)
+        for attempt in range(3):
+            generation = self._generation
+            response = self.session.request(method, url, **kwargs)
+            if not is_login_response(response) or attempt == 2:
+                return response
+            response.close()
+            self._reauthenticate(generation, relogin=attempt == 1)
+        return response
+
+    def head(self, url: str, **kwargs) -> requests.Response:
+        return self.request("HEAD", url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def download(self, url: str, path: str) -> int:
+        """Stream ``url`` to ``path`` atomically and return the byte count; raises RuntimeError on failure."""
+        with self.get(url, stream=True) as response:
+            if response.status_code != 200:
+                raise RuntimeError(f"HTTP {response.status_code}")
+            if is_login_response(response):
+                raise RuntimeError("still redirected to the Enrollware login page after re-authenticating")
+            temp_path = f"{path}.part"
+            size = 0
+            try:
+                with open(temp_path, "wb") as f:
+                    for chunk in response.iter_content(CHUNK_SIZE):
+                        f.write(chunk)
+                        size += len(chunk)
+                os.replace(temp_path, path)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+        return size
+
+    def close(self) -> None:
+        self.session.close()
+
+
+def _parse_content_range_total(value: str) -> Optional[int]:
+    # e.g. "bytes 0-0/48213"
+    match = re.search(r"/(\d+)\s*$", value or "")
+    return int(match.group(1)) if match else None
+
+
+def probe_remote_file(session, url: str, timeout: int = PROBE_TIMEOUT) -> Tuple[Optional[int], str]:
+    """Return (size in bytes, content type) for a file URL without downloading it.
+
+    Tries HEAD first and falls back to a one-byte Range GET for servers that do not
+    report Content-Length on HEAD. Size is None when the server does not disclose it.
+    """
+    http = session or requests
+    try:
+        response = http.head(url, allow_redirects=True, timeout=timeout)
+        content_type = response.headers.get("Content-Type", "")
+        length = response.headers.get("Content-Length")
+        if response.status_code == 200 and length and length.isdigit():
+            return int(length), content_type
+    except requests.RequestException as e:
+        logger.warning(f"HEAD probe failed for {url}: {e}")
+
+    try:
+        response = http.get(url, headers={"Range": "bytes=0-0"}, stream=True, timeout=timeout)
+        try:
+            content_type = response.headers.get("Content-Type", "")
+            if response.status_code == 206:
+                return _parse_content_range_total(response.headers.get("Content-Range", "")), content_type
+            length = response.headers.get("Content-Length")
+            if response.status_code == 200 and length and length.isdigit():
+                return int(length), content_type
+            return None, content_type
+        finally:
+            response.close()
+    except requests.RequestException as e:
+        logger.warning(f"Range probe failed for {url}: {e}")
+        return None, ""
+
+
+def preflight_files(
+    session,
+    file_infos: List[dict],
+    max_bytes: Optional[int] = None,
+    can_shrink: Optional[Callable[[dict], bool]] = None,
+) -> Tuple[List[dict], List[dict]]:
+    """Probe every file before downloading; return (accepted, oversize).
+
+    Files already present locally are measured on disk instead of probed. Each file
+    info gets ``size`` and ``content_type`` keys. Oversize files for which ``can_shrink``
+    returns True are still accepted so the optimization stage can bring them under the
+    limit. Accepted files are ordered smallest first (unknown sizes last) so quick
+    transfers finish before large ones.
+    """
+    accepted, oversize = [], []
+    for file_info in file_infos:
+        local_path = file_info.get("path")
+        if local_path and os.path.exists(local_path):
+            size, content_type = os.path.getsize(local_path), ""
+        else:
+            size, content_type = probe_remote_file(session, file_info["url"])
+        file_info["size"] = size
+        file_info["content_type"] = content_type
+        if max_bytes is not None and size is not None and size > max_bytes:
+            if can_shrink is not None and can_shrink(file_info):
+                logger.info(f"Oversize file {file_info['name']} ({size} bytes) will be optimized before upload")
+                accepted.append(file_info)
+                continue
+            logger.warning(f"Skipping oversize file {file_info['name']}: {size} bytes exceeds limit of {max_bytes}")
+            oversize.append(file_info)
+            continue
+        accepted.append(file_info)
+    accepted.sort(key=lambda item: (item["size"] is None, item["size"] or 0))
+    return accepted, oversize
@@ -0,0 +1,280 @@
+import os
+import sys
+import json
+import time
+import atexit
+import shutil
+import logging
+import platform
+import tempfile
+import threading
+import itertools
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PROFILE_TEMPLATE = os.path.join(BASE_DIR, "chrome-dir")
+PATHS_CACHE = os.path.join(tempfile.gettempdir(), "enrollware-driver-paths.json")
+TMPFS_DIR = "/dev/shm"
+
+CHROME_CANDIDATES = {
+    "Windows": [
+        r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+        r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+        os.path.join(os.getenv("LOCALAPPDATA", ""), r"Google\Chrome\Application\chrome.exe"),
+    ],
+    "Darwin": [
+        "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+        "/Applications/Chromium.app/Contents/MacOS/Chromium",
+    ],
+    "Linux": ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser"],
+}
+# Older checkouts ship chromedriver next to this file (named chrome.exe on Windows).
+BUNDLED_CHROMEDRIVERS = [os.path.join(BASE_DIR, "chrome.exe"), os.path.join(BASE_DIR, "chromedriver")]
+
+# Per-session state and caches that must not be copied from the template: the lock files
+# would make Chrome refuse the clone, and the caches are large and rebuilt quickly.
+PROFILE_COPY_IGNORE = shutil.ignore_patterns(
+    "Singleton*", "*.lock", "lockfile", "Crashpad", "Cache", "Code Cache", "GPUCache",
+    "ShaderCache", "GrShaderCache", "DawnCache", "Service Worker",
+)
+
+STEALTH_JS = """
+Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
+Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]});
+Object.defineProperty(navigator, 'languages', {get: () => ['en-US', 'en']});
+window.chrome = {runtime: {}};
+"""
+
+
+@dataclass
+class BrowserPaths:
+    chrome_binary: Optional[str] = None
+    chromedriver: Optional[str] = None
+
+
+_paths: Optional[BrowserPaths] = None
+_paths_lock = threading.Lock()
+_clones: Dict[int, str] = {}
+_clone_counter = itertools.count()
+startup_times: List[float] = []
+
+
+def _is_executable(path: Optional[str]) -> bool:
+    return bool(path) and os.path.isfile(path) and os.access(path, os.X_OK)
+
+
+def _find_chrome_binary() -> Optional[str]:
+    env_path = os.getenv("CHROME_BINARY")
+    if env_path:
+        return env_path
+    for candidate in CHROME_CANDIDATES.get(platform.system(), []):
+        path = candidate if os.path.isabs(candidate) else shutil.which(candidate)
+        if _is_executable(path):
+            return path
+    return None
+
+
+def _find_chromedriver() -> Optional[str]:
+    env_path = os.getenv("CHROMEDRIVER_PATH")
+    if env_path:
+        return env_path
+    for path in [*BUNDLED_CHROMEDRIVERS, shutil.which("chromedriver")]:
+        if _is_executable(path):
+            return path
+    return None
+
+
+def _selenium_manager_paths(chrome_binary: Optional[str]) -> BrowserPaths:
+    """Ask Selenium Manager (may download a matching driver); slow, so only used on a cache miss."""
+    from selenium.webdriver.common.driver_finder import DriverFinder
+    options = webdriver.ChromeOptions()
+    if chrome_binary:
+        options.binary_location = chrome_binary
+    finder = DriverFinder(Service(), options)
+    return BrowserPaths(chrome_binary=chrome_binary or finder.get_browser_path() or None,
+                        chromedriver=finder.get_driver_path() or None)
+
+
+def _load_cached_paths() -> Optional[BrowserPaths]:
+    try:
+        with open(PATHS_CACHE, "r", encoding="utf-8") as f:
+            paths = BrowserPaths(**json.load(f))
+    except (OSError, ValueError, TypeError):
+        return None
+    if _is_executable(paths.chromedriver) and (paths.chrome_binary is None or os.path.isfile(paths.chrome_binary)):
+        return paths
+    return None
+
+
+def resolve_browser_paths() -> BrowserPaths:
+    """Locate Chrome and chromedriver once per process (and across runs via a small cache file).
+
+    Order: CHROME_BINARY / CHROMEDRIVER_PATH, the platform's usual install locations and PATH,
+    then Selenium Manager. Environment variables always win over the cache.
+    """
+    global _paths
+    with _paths_lock:
+        if _paths is not None:
+            return _paths
+        started = time.perf_counter()
+        paths = BrowserPaths(_find_chrome_binary(), _find_chromedriver())
+        if paths.chromedriver is None:
+            cached = None if os.getenv("CHROME_BINARY") else _load_cached_paths()
+            if cached:
+                paths = cached
+            else:
+                try:
+                    paths = _selenium_manager_paths(paths.chrome_binary)
+                    with open(PATHS_CACHE, "w", encoding="utf-8") as f:
+                        json.dump(asdict(paths), f)
+                except Exception as e:
+                    logger.warning(f"Selenium Manager could not resolve chromedriver: {e}")
+        logger.info(f"Resolved Chrome {paths.chrome_binary or '(default)'} and chromedriver "
+                    f"{paths.chromedriver or '(Selenium Manager)'} in {time.perf_counter() - started:.2f}s")
+        _paths = paths
+        return paths
+
+
+def get_profile_template() -> str:
+    return os.getenv("CHROME_PROFILE_DIR") or DEFAULT_PROFILE_TEMPLATE
+
+
+def _clone_enabled() -> bool:
+    setting = str(os.getenv("CHROME_PROFILE_CLONE") or "").strip().lower()
+    if setting in ("0", "false", "no", "off"):
+        return False
+    return os.path.isdir(TMPFS_DIR) and os.access(TMPFS_DIR, os.W_OK)
+
+
+def prepare_profile() -> Optional[str]:
+    """Return the user-data-dir for a new browser.
+
+    On hosts with a writable tmpfs (``/dev/shm``) the warm profile template is cloned there,
+    one copy per browser, so workers never share a profile lock and profile I/O stays in
+    memory. Elsewhere (or with CHROME_PROFILE_CLONE=0) the template itself is used.
+    """
+    template = get_profile_template()
+    try:
+        os.makedirs(template, exist_ok=True)
+    except OSError as e:
+        logger.error(f"Failed to create chrome directory: {e}")
+        return None
+    if not _clone_enabled():
+        return template
+    clone = os.path.join(TMPFS_DIR, f"enrollware-chrome-{os.getpid()}-{next(_clone_counter)}")
+    try:
+        shutil.copytree(template, clone, ignore=PROFILE_COPY_IGNORE, dirs_exist_ok=True)
+        return clone
+    except (OSError, shutil.Error) as e:
+        logger.warning(f"Could not clone Chrome profile to {clone}, using the template: {e}")
+        shutil.rmtree(clone, ignore_errors=True)
+        return template
+
+
+def release_profile(driver) -> None:
+    """Delete the tmpfs profile clone of a browser that has been quit."""
+    clone = _clones.pop(id(driver), None)
+    if clone:
+        shutil.rmtree(clone, ignore_errors=True)
+
+
+@atexit.register
+def _remove_clones() -> None:
+    for clone in list(_clones.values()):
+        shutil.rmtree(clone, ignore_errors=True)
+    _clones.clear()
+
+
+def build_options(headless: bool, profile_dir: Optional[str], chrome_binary: Optional[str]) -> webdriver.ChromeOptions:
+    options = webdriver.ChromeOptions()
+    if chrome_binary:
+        options.binary_location = chrome_binary
+    if profile_dir:
+        options.add_argument(f'--user-data-dir={profile_dir}')
+
+    # Enhanced options for stability
+    options.add_argument("--log-level=3")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_argument("--disable-extensions")
+    options.add_argument("--disable-plugins")
+    options.add_argument("--disable-images")
+    options.add_argument("--disable-javascript")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-background-timer-throttling")
+    options.add_argument("--disable-backgrounding-occluded-windows")
+    options.add_argument("--disable-renderer-backgrounding")
+    options.add_argument("--disable-features=TranslateUI")
+    options.add_argument("--disable-ipc-flooding-protection")
+    # Startup work a scraping session never needs.
+    options.add_argument("--no-first-run")
+    options.add_argument("--no-default-browser-check")
+    options.add_argument("--disable-background-networking")
+    options.add_argument("--disable-component-update")
+    options.add_argument("--disable-sync")
+
+    if headless:
+        options.add_argument("--headless")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--window-size=1920,1080")
+    else:
+        options.add_argument("--start-maximized")
+
+    # Experimental options for better stability
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+    return options
+
+
+def start_driver(headless: bool = True, max_retries: int = 3) -> Optional[webdriver.Chrome]:
+    """Start Chrome and return it once DevTools answers; logs and records the startup latency."""
+    paths = resolve_browser_paths()
+    for attempt in range(max_retries):
+        driver = None
+        profile_dir = prepare_profile()
+        started = time.perf_counter()
+        try:
+            service = Service(executable_path=paths.chromedriver) if paths.chromedriver else Service()
+            driver = webdriver.Chrome(service=service, options=build_options(headless, profile_dir, paths.chrome_binary))
+            if profile_dir and profile_dir != get_profile_template():
+                _clones[id(driver)] = profile_dir
+            # CDP handshake: the browser is ready as soon as DevTools answers, no fixed sleep needed.
+            version = driver.execute_cdp_cmd("Browser.getVersion", {})
+            # Registered once, applied before any script of every page the session loads.
+            driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": STEALTH_JS})
+            elapsed = time.perf_counter() - started
+            startup_times.append(elapsed)
+            logger.info(f"Chrome driver ready in {elapsed:.2f}s ({version.get('product', 'Chrome')}, attempt {attempt + 1})")
+            return driver
+        except Exception as e:
+            logger.error(f"Driver creation attempt {attempt + 1} failed: {e}")
+            if driver:
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+                release_profile(driver)
+            elif profile_dir and profile_dir != get_profile_template():
+                shutil.rmtree(profile_dir, ignore_errors=True)
+            if attempt < max_retries - 1:
+                time.sleep(0.5 * (attempt + 1))
+    logger.error("Max retries exceeded. Could not create the driver.")
+    return None
+
+
+def open_profile_template() -> None:
+    """Open a visible Chrome on the profile template so it can be warmed (log in once, accept prompts)."""
+    import subprocess
+    chrome_binary = resolve_browser_paths().chrome_binary
+    if not chrome_binary:
+        logger.error("Chrome was not found; set CHROME_BINARY")
+        return
+    template = get_profile_template()
+    os.makedirs(template, exist_ok=True)
+    subprocess.Popen([chrome_binary, f"--user-data-dir={template}", "--window-position=0,0"],
+                     start_new_session=sys.platform != "win32")
@@ -0,0 +1,199 @@
+import time
+import logging
+from collections import deque
+from typing import Callable, List, Optional
+from urllib.parse import urlsplit
+from selenium.common.exceptions import WebDriverException
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
+from .utils import get_undetected_driver
+from .driver_bootstrap import release_profile, startup_times
+
+try:
+    import psutil
+except ImportError:  # psutil is optional; without it only page-load thresholds apply
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+# Error fragments that mean the browser or chromedriver is gone rather than a page problem.
+DEAD_DRIVER_MARKERS = (
+    "invalid session id",
+    "no such window",
+    "chrome not reachable",
+    "disconnected",
+    "target window already closed",
+    "session deleted",
+    "connection refused",
+    "actively refused",
+    "max retries exceeded",
+)
+
+# A dead chromedriver surfaces as urllib3 MaxRetryError / ConnectionError from Selenium's
+# HTTP transport, which are not WebDriverException subclasses.
+DRIVER_ERRORS = (WebDriverException, Urllib3HTTPError, ConnectionError)
+
+
+def is_dead_driver_error(exc: Exception) -> bool:
+    message = str(exc).lower()
+    return any(marker in message for marker in DEAD_DRIVER_MARKERS)
+
+
+class DriverManager:
+    """Own the Chrome driver: watch memory and page-load latency, recycle it transparently.
+
+    A recycle quits the browser, starts a fresh one, restores the Enrollware cookies
+    (so no full relogin is needed) and reopens the page the old driver was on.
+    """
+
+    def __init__(
+        self,
+        headless: bool = True,
+        max_rss_mb: float = 1500,
+        max_page_loads: int = 500,
+        max_avg_load_seconds: float = 20.0,
+        latency_window: int = 20,
+        cookie_snapshot_interval: int = 25,
+        relogin: Optional[Callable[[object], bool]] = None,
+    ) -> None:
+        self.headless = headless
+        self.max_rss_mb = max_rss_mb
+        self.max_page_loads = max_page_loads
+        self.max_avg_load_seconds = max_avg_load_seconds
+        self.cookie_snapshot_interval = cookie_snapshot_interval
+        self.relogin = relogin
+        self.driver = None
+        self.current_url = ""
+        self.page_loads = 0
+        self.peak_rss_mb = 0.0
+        self.recycle_events: List[dict] = []
+        self._load_times = deque(maxlen=latency_window)
+        self._cookies: List[dict] = []
+
+    def start(self) -> bool:
+        self.driver = get_undetected_driver(headless=self.headless)
+        self.page_loads = 0
+        self._load_times.clear()
+        return self.driver is not None
+
+    def browser_rss_mb(self) -> float:
+        """Resident memory of chromedriver plus all Chrome child processes, in MB."""
+        if psutil is None or self.driver is None:
+            return 0.0
+        try:
+            root = psutil.Process(self.driver.service.process.pid)
+            processes = [root] + root.children(recursive=True)
+        except (psutil.Error, AttributeError):
+            return 0.0
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                continue
+        rss_mb = total / (1024 * 1024)
+        self.peak_rss_mb = max(self.peak_rss_mb, rss_mb)
+        return rss_mb
+
+    def _recycle_reason(self) -> Optional[str]:
+        if self.page_loads >= self.max_page_loads:
+            return f"page load limit ({self.page_loads})"
+        if len(self._load_times) == self._load_times.maxlen:
+            average = sum(self._load_times) / len(self._load_times)
+            if average > self.max_avg_load_seconds:
+                return f"slow page loads (avg {average:.1f}s)"
+        rss_mb = self.browser_rss_mb()
+        if rss_mb > self.max_rss_mb:
+            return f"memory {rss_mb:.0f} MB > {self.max_rss_mb:.0f} MB"
+        return None
+
+    def snapshot_cookies(self) -> None:
+        try:
+            self._cookies = self.driver.get_cookies()
+        except DRIVER_ERRORS as e:
+            logger.warning(f"Could not snapshot browser cookies: {e}")
+
+    def _restore_session(self) -> None:
+        if self._cookies and self.current_url:
+            parts = urlsplit(self.current_url)
+            # Cookies can only be set for the domain currently loaded.
+            self.driver.get(f"{parts.scheme}://{parts.netloc}/favicon.ico")
+            for cookie in self._cookies:
+                cookie = {key: value for key, value in cookie.items() if key != "sameSite" or value in ("Strict", "Lax", "None")}
+                try:
+                    self.driver.add_cookie(cookie)
+                except WebDriverException as e:
+                    logger.debug(f"Skipping cookie {cookie.get('name')}: {e}")
+        if self.current_url:
+            self.driver.get(self.current_url)
+            if "login" in self.driver.current_url.lower() and self.relogin:
+                logger.warning("Cookie restore did not keep the session; logging in again")
+                self.relogin(self.driver)
+                self.driver.get(self.current_url)
+
+    def recycle(self, reason: str, crashed: bool = False) -> bool:
+        """Replace the browser and resume at the current URL."""
+        rss_mb = self.browser_rss_mb()
+        self.recycle_events.append({
+            "reason": reason,
+            "rss_mb": round(rss_mb, 1),
+            "page_loads": self.page_loads,
+            "at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        })
+        logger.warning(f"Recycling Chrome driver: {reason} (rss {rss_mb:.0f} MB, {self.page_loads} page loads)")
+        if self.driver is not None:
+            if not crashed:
+                self.snapshot_cookies()
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            release_profile(self.driver)
+        if not self.start():
+            logger.error("Failed to start a replacement Chrome driver")
+            return False
+        try:
+            self._restore_session()
+        except DRIVER_ERRORS as e:
+            logger.error(f"Could not restore session after recycle: {e}")
+            return False
+        return True
+
+    def navigate(self, url: str) -> None:
+        """``driver.get`` with proactive recycling and one transparent retry on a crashed driver."""
+        reason = self._recycle_reason()
+        if reason and not self.recycle(reason):
+            # Surface it as a dead driver so callers take the crash path (one more recycle, then give up).
+            raise WebDriverException(f"chrome not reachable: replacement browser failed to start ({reason})")
+        self.current_url = url
+        started = time.perf_counter()
+        try:
+            self.driver.get(url)
+        except DRIVER_ERRORS as e:
+            if not is_dead_driver_error(e):
+                raise
+            if not self.recycle(f"driver crash: {getattr(e, 'msg', None) or e}", crashed=True):
+                raise
+        self._load_times.append(time.perf_counter() - started)
+        self.page_loads += 1
+        if self.page_loads % self.cookie_snapshot_interval == 1:
+            self.snapshot_cookies()
+
+    def report(self) -> None:
+        self.browser_rss_mb()
+        logger.info(
+            f"Driver stats: {len(self.recycle_events)} recycle(s), peak browser memory {self.peak_rss_mb:.0f} MB"
+            + ("" if psutil else " (install psutil for memory tracking)")
+        )
+        if startup_times:
+            logger.info(f"Driver startup: {len(startup_times)} start(s), avg {sum(startup_times) / len(startup_times):.2f}s, "
+                        f"max {max(startup_times):.2f}s")
+        for event in self.recycle_events:
+            logger.info(f"  recycle at {event['at']}: {event['reason']} (rss {event['rss_mb']} MB, {event['page_loads']} page loads)")
+
+    def quit(self) -> None:
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            finally:
+                release_profile(self.driver)
+                self.driver = None
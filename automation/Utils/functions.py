@@ -5,21 +5,31 @@ import time
 import logging
 import json
 import difflib
-from typing import List
+from typing import List, Optional
 from dotenv import load_dotenv
 from .utils import (
     safe_navigate_to_url, check_element_exists,
     input_element, click_element_by_js, select_by_text,
     get_element_attribute, check_if_attribute_exists
 )
+from .tracing import tracer
 
 # Load environment variables and validate
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Certification table on the user-edit page; columns are mapped by the whole words of their
+# header text. Fields are tried in this order, so "Card Expiration" is a date and
+# "Certification Number" a number rather than a name.
+CERTIFICATION_TABLE_XPATH = "//table[contains(translate(@id, 'CERT', 'cert'), 'cert')]"
+CERTIFICATION_COLUMNS = {
+    "expiration_date": {"expiration", "expires", "expire", "expiry", "exp", "renewal", "renew", "until", "end"},
+    "issue_date": {"issue", "issued", "start", "from"},
+    "certification_number": {"number", "num", "no", "#"},
+    "certification_name": {"course", "discipline", "certification", "certificate", "name"},
+}
+
 # Validate required environment variables
 REQUIRED_ENV_VARS = ["ENROLLWARE_USERNAME", "ENROLLWARE_PASSWORD"]
 
@@ -32,7 +42,7 @@ def validate_environment_variables() -> bool:
     return True
 
 
-def login_to_enrollware_and_navigate_to_instructor_records(driver, max_retries: int = 3) -> bool:
+def login_to_enrollware_and_navigate_to_instructor_records(driver, max_retries: int = 3, show_all: bool = True) -> bool:
     if not validate_environment_variables():
         return False
 
@@ -74,7 +84,7 @@ def login_to_enrollware_and_navigate_to_instructor_records(driver, max_retries:
                     logger.warning("Login may have failed, checking current URL")
                     continue
 
-            return navigate_to_instructor_records(driver)
+            return navigate_to_instructor_records(driver, show_all=show_all)
 
         except:
             if attempt < max_retries - 1:
@@ -85,14 +95,15 @@ def login_to_enrollware_and_navigate_to_instructor_records(driver, max_retries:
     return False
 
 
-def navigate_to_instructor_records(driver, max_retries: int = 3) -> bool:
+def navigate_to_instructor_records(driver, max_retries: int = 3, show_all: bool = True) -> bool:
     for attempt in range(max_retries):
         try:
             url = "https://www.enrollware.com/admin/tc-user-list.aspx"
             if safe_navigate_to_url(driver, url):
                 logger.info("Successfully navigated to Instructor Records")
                 # apply all filters
-                select_by_text(driver, (By.XPATH, "//div[@class='dataTables_length']//select"), 'All')
+                if show_all:
+                    show_all_instructor_rows(driver)
                 return True
         except Exception as e:
             logger.error(f"Navigation attempt {attempt + 1} failed: {e}")
@@ -104,6 +115,79 @@ def navigate_to_instructor_records(driver, max_retries: int = 3) -> bool:
     return False
 
 
+def show_all_instructor_rows(driver) -> bool:
+    """Switch the DataTables page length to "All" so every row is rendered in the DOM."""
+    return select_by_text(driver, (By.XPATH, "//div[@class='dataTables_length']//select"), 'All')
+
+
+# Reads one page of the instructor DataTable from its client-side data in a single call.
+# Rows that were never drawn have no DOM node, so their cell HTML is parsed instead.
+INSTRUCTOR_ROWS_SCRIPT = r"""
+const start = arguments[0], length = arguments[1];
+const jq = window.jQuery;
+if (!jq || !jq.fn || !jq.fn.dataTable) { return null; }
+const tables = jq.fn.dataTable.tables();
+const table = tables.find(t => t.querySelector("a[href*='user-edit']")) || tables[0];
+if (!table) { return null; }
+const api = jq(table).DataTable();
+if (api.page.info().serverSide) { return null; }
+const allIndexes = api.rows({order: 'applied'}).indexes().toArray();
+const indexes = allIndexes.slice(start, start + length);
+const emailPattern = /[^\s@<>"]+@[^\s@<>"]+\.[^\s@<>"]+/;
+const rows = indexes.map(index => {
+    const row = api.row(index);
+    let container = row.node();
+    if (!container) {
+        const data = row.data();
+        const cells = Array.isArray(data) ? data : Object.values(data || {});
+        container = document.createElement('template');
+        container.innerHTML = cells.map(cell => '<div>' + cell + '</div>').join('');
+        container = container.content;
+    }
+    const link = container.querySelector("a[href*='user-edit']");
+    if (!link) { return null; }
+    const text = container.textContent || '';
+    const email = (text.match(emailPattern) || [''])[0];
+    // Anchors parsed into a <template> resolve against about:blank, so resolve against the page.
+    const url = new URL(link.getAttribute('href'), document.baseURI).href;
+    return {url: url, name: (link.textContent || '').trim(), email: email};
+});
+return {total: allIndexes.length, rows: rows.filter(item => item)};
+"""
+
+
+def enumerate_instructor_rows(driver, page_size: int = 500) -> Optional[List[dict]]:
+    """Read every instructor row ({url, name, email}) through the DataTables JS API, page by page.
+
+    One WebDriver call per ``page_size`` rows and no need to render the full table. Returns None
+    when the page has no client-side DataTable so callers can fall back to DOM scraping.
+    """
+    rows: List[dict] = []
+    start = 0
+    while True:
+        try:
+            page = driver.execute_script(INSTRUCTOR_ROWS_SCRIPT, start, page_size)
+        except Exception as e:
+            logger.warning(f"DataTables enumeration failed, falling back to DOM: {e}")
+            return None
+        if page is None:
+            return None
+        rows.extend(page.get("rows") or [])
+        start += page_size
+        if start >= int(page.get("total") or 0):
+            break
+    logger.info(f"Enumerated {len(rows)} instructor rows via DataTables API")
+    return rows
+
+
+def enumerate_instructor_rows_from_dom(driver) -> List[dict]:
+    """Fallback enumeration from the rendered table (requires the "All" page length)."""
+    rows = []
+    for link in driver.find_elements(By.XPATH, "//td/a[contains(@href, 'user-edit')]"):
+        rows.append({"url": link.get_attribute("href"), "name": str(link.text or "").strip(), "email": ""})
+    return rows
+
+
 def clean_username(entry: str) -> str:
     # Status phrases and non-name words to remove
     status_patterns = [
@@ -153,11 +237,12 @@ def clean_username(entry: str) -> str:
 def get_element_value(driver, element_id: str) -> str:
     try:
         locator = (By.ID, f"mainContent_{element_id}")
-        value = get_element_attribute(driver, locator, "value")
+        with tracer.span(f"field:{element_id}", "field"):
+            value = get_element_attribute(driver, locator, "value")
         if value is not None:
             return value
         else:
-            logger.warning(f"Element {locator} does not have a 'value' attribute.")
+            logger.warning(f"Element {locator} does not have a 'value' attribute.", extra={"rate_limited": True})
             return ""
     except Exception as e:
         logger.error(f"An error occurred while getting element value: {e}")
@@ -167,7 +252,8 @@ def get_element_value(driver, element_id: str) -> str:
 def get_checkbox_value(driver, element_id: str) -> str:
     try:
         locator = (By.ID, f"mainContent_{element_id}")
-        return '1' if check_if_attribute_exists(driver, locator, "checked") else '0'
+        with tracer.span(f"field:{element_id}", "field"):
+            return '1' if check_if_attribute_exists(driver, locator, "checked") else '0'
     except Exception as e:
         logger.error(f"An error occurred while getting checkbox value: {e}")
         return '0'
@@ -258,3 +344,63 @@ def extract_response_message(response) -> str:
             if nested_message:
                 return str(nested_message)
     return ""
+
+
+def extract_certifications(driver) -> List[dict]:
+    """Read the certification table of the open user-edit page in a single WebDriver call."""
+    script = """
+    const table = document.evaluate(arguments[0], document, null,
+        XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    if (!table) { return null; }
+    const headers = Array.from(table.querySelectorAll('th')).map(th => th.innerText.trim());
+    const rows = Array.from(table.querySelectorAll('tr')).filter(tr => tr.querySelector('td'))
+        .map(tr => Array.from(tr.querySelectorAll('td')).map(td => td.innerText.trim()));
+    return {headers: headers, rows: rows};
+    """
+    try:
+        table = driver.execute_script(script, CERTIFICATION_TABLE_XPATH)
+    except Exception as e:
+        logger.error(f"An error occurred while reading certifications: {e}")
+        return []
+    if not table:
+        return []
+    return map_certification_rows(table.get("headers") or [], table.get("rows") or [])
+
+
+def map_certification_rows(headers: List[str], rows: List[List[str]]) -> List[dict]:
+    """Map raw table cells to certifications/store fields using the column headers."""
+    column_index = {}
+    for index, header in enumerate(headers):
+        words = set(re.findall(r"[a-z]+|#", str(header).lower()))
+        for field, keywords in CERTIFICATION_COLUMNS.items():
+            if words & keywords:
+                column_index.setdefault(field, index)
+                break
+    if "certification_name" not in column_index:
+        return []
+    certifications = []
+    for row in rows:
+        record = {field: row[index].strip() if index < len(row) else "" for field, index in column_index.items()}
+        if record.get("certification_name"):
+            certifications.append(record)
+    return certifications
+
+
+def certification_key(certification: dict) -> tuple:
+    """Normalized identity of a certification, comparable between Enrollware and the API."""
+    name = str(certification.get("certification_name") or certification.get("name") or "").strip().lower()
+    number = str(certification.get("certification_number") or certification.get("number") or "").strip().lower()
+    return name, number
+
+
+def extract_certification_keys(certifications) -> set:
+    """Return normalized keys of the certifications already stored for an instructor."""
+    keys = set()
+    if not isinstance(certifications, list):
+        return keys
+    for certification in certifications:
+        if isinstance(certification, dict):
+            key = certification_key(certification)
+            if key[0]:
+                keys.add(key)
+    return keys
@@ -1,7 +1,10 @@
 import os
 import sys
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-chrome_path = r"C:\Program Files\Google\Chrome\Application\chrome.exe"
-# cd = os.path.join(os.path.dirname(sys.executable), "chrome-dir")
-cd = rf"{BASE_DIR}\chrome-dir"
-os.system(f"start \"\" \"{chrome_path}\" --user-data-dir=\"{cd}\" --window-position=0,0")
+
+# Opens a visible Chrome on the profile template (automation/Utils/chrome-dir or CHROME_PROFILE_DIR)
+# so it can be warmed once by hand; every automated browser starts from a copy of it.
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Utils.driver_bootstrap import open_profile_template  # noqa: E402
+
+open_profile_template()
@@ -0,0 +1,80 @@
+import os
+import json
+import hashlib
+import logging
+from typing import Dict, List, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def row_fingerprint(row: dict) -> str:
+    """Stable hash of the list-page fields that identify an instructor (name and email)."""
+    name = str(row.get("name") or "").strip().lower()
+    email = str(row.get("email") or "").strip().lower()
+    return hashlib.sha1(f"{name}|{email}".encode("utf-8")).hexdigest()
+
+
+def _normalized(value) -> str:
+    return str(value or "").strip().lower()
+
+
+def _row_changed(previous: dict, row: dict) -> bool:
+    # Emails are only compared when both enumerations captured one: the DOM fallback
+    # does not read emails and must not make every instructor look changed.
+    if _normalized(previous.get("name")) != _normalized(row.get("name")):
+        return True
+    old_email, new_email = _normalized(previous.get("email")), _normalized(row.get("email"))
+    return bool(old_email and new_email and old_email != new_email)
+
+
+class InstructorIndex:
+    """Cached instructor URL set with row fingerprints from the previous enumeration.
+
+    Comparing a fresh enumeration with the cache tells which instructors are new or
+    changed without opening their user-edit pages.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.entries: Dict[str, dict] = self._load()
+
+    def _load(self) -> Dict[str, dict]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable instructor index {self.path}: {e}")
+            return {}
+
+    def diff(self, rows: List[dict]) -> Tuple[Set[str], Set[str], Set[str]]:
+        """Classify enumerated rows into (new, changed, unchanged) URL sets."""
+        new, changed, unchanged = set(), set(), set()
+        for row in rows:
+            url = row["url"]
+            previous = self.entries.get(url)
+            if previous is None:
+                new.add(url)
+            elif previous.get("fingerprint") != row_fingerprint(row) and _row_changed(previous, row):
+                changed.add(url)
+            else:
+                unchanged.add(url)
+        logger.info(f"Instructor list: {len(new)} new, {len(changed)} changed, {len(unchanged)} unchanged")
+        return new, changed, unchanged
+
+    def update(self, rows: List[dict]) -> None:
+        entries = {}
+        for row in rows:
+            email = row.get("email") or self.entries.get(row["url"], {}).get("email", "")
+            entry = {"name": row.get("name", ""), "email": email}
+            entry["fingerprint"] = row_fingerprint(entry)
+            entries[row["url"]] = entry
+        self.entries = entries
+
+    def save(self) -> None:
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f)
+        os.replace(temp_path, self.path)
@@ -0,0 +1,216 @@
+import os
+import json
+import queue
+import atexit
+import random
+import logging
+import threading
+import contextvars
+import multiprocessing
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+CONSOLE_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Correlation ID of the instructor currently being processed ("-" outside of one).
+correlation_id: contextvars.ContextVar = contextvars.ContextVar("correlation_id", default="-")
+
+_listener: Optional[QueueListener] = None
+_rate_limiter: Optional["RateLimitFilter"] = None
+_handlers: List[logging.Handler] = []
+_worker_queue = None
+_worker_listener: Optional[QueueListener] = None
+
+
+@contextmanager
+def log_context(value: str) -> Iterator[None]:
+    """Tag every log record emitted inside the block with ``value`` as correlation ID."""
+    token = correlation_id.set(value)
+    try:
+        yield
+    finally:
+        correlation_id.reset(token)
+
+
+class CorrelationIdFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.correlation_id = correlation_id.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of records per level; WARNING and above are never sampled."""
+
+    def __init__(self, rates: Dict[int, float]) -> None:
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = self.rates.get(record.levelno, 1.0)
+        return rate >= 1.0 or random.random() < rate
+
+
+class RateLimitFilter(logging.Filter):
+    """Allow ``burst`` opted-in WARNING records per call site per ``window`` seconds and count the rest.
+
+    Only records logged with ``extra={"rate_limited": True}`` are limited (the routine misses
+    of optional form fields); every other warning needs attention and always passes. A call
+    site is (logger, file, line), so every miss logged from the same line shares one budget.
+    Once the window rolls over, the next record from that site carries the number of
+    suppressed duplicates. INFO is left to sampling and ERROR is never dropped.
+    """
+
+    def __init__(self, burst: int = 5, window: float = 60.0) -> None:
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self._sites: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno != logging.WARNING or not getattr(record, "rate_limited", False):
+            return True
+        key = (record.name, record.pathname, record.lineno)
+        with self._lock:
+            # [window start, emitted in window, suppressed in window, suppressed total]
+            site = self._sites.setdefault(key, [record.created, 0, 0, 0])
+            if record.created - site[0] >= self.window:
+                if site[2]:
+                    record.msg = f"{record.getMessage()} (suppressed {site[2]} similar message(s) in the last {self.window:.0f}s)"
+                    record.args = None
+                site[0], site[1], site[2] = record.created, 0, 0
+            if site[1] >= self.burst:
+                site[2] += 1
+                site[3] += 1
+                return False
+            site[1] += 1
+            return True
+
+    def summary(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                f"{name} {os.path.basename(path)}:{line}": counts[3]
+                for (name, path, line), counts in self._sites.items() if counts[3]
+            }
+
+
+class JsonLinesFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "correlation_id": getattr(record, "correlation_id", "-"),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+
+def parse_sample_rates(raw: str) -> Dict[int, float]:
+    """Parse ``"INFO=0.5,DEBUG=0.1"`` into {levelno: rate}."""
+    rates = {}
+    for part in (raw or "").split(","):
+        if "=" not in part:
+            continue
+        level_name, _, value = part.partition("=")
+        level = logging.getLevelName(level_name.strip().upper())
+        try:
+            if isinstance(level, int) and level < logging.WARNING:
+                rates[level] = max(0.0, min(1.0, float(value)))
+        except ValueError:
+            continue
+    return rates
+
+
+def configure_logging(
+    level: int = logging.INFO,
+    json_path: Optional[str] = None,
+    sample_rates: Optional[Dict[int, float]] = None,
+    rate_limit_burst: int = 5,
+    rate_limit_window: float = 60.0,
+) -> None:
+    """Route all logging through a queue so callers never block on console or file I/O.
+
+    Records are filtered (correlation ID, sampling, per-call-site rate limiting) in the
+    calling thread and written by a background QueueListener to the console and,
+    optionally, to a JSON-lines file.
+    """
+    global _listener, _rate_limiter, _handlers
+    if _listener is not None:
+        return
+    if sample_rates is None:
+        sample_rates = parse_sample_rates(os.getenv("LOG_SAMPLE_RATES", ""))
+
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+    handlers = [console]
+    if json_path:
+        file_handler = logging.FileHandler(json_path, encoding="utf-8")
+        file_handler.setFormatter(JsonLinesFormatter())
+        handlers.append(file_handler)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.addFilter(CorrelationIdFilter())
+    if sample_rates:
+        queue_handler.addFilter(SamplingFilter(sample_rates))
+    _rate_limiter = RateLimitFilter(rate_limit_burst, rate_limit_window)
+    queue_handler.addFilter(_rate_limiter)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+    # httpx logs every request at INFO; keep it for debugging only.
+    logging.getLogger("httpx").setLevel(max(level, logging.WARNING))
+
+    _handlers = handlers
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def configure_worker_logging(log_queue, level: int) -> None:
+    """Process pool initializer: send the worker's records to the parent over ``log_queue``.
+
+    Forked workers inherit the parent's QueueHandler, but its in-process queue has no
+    listener on their side, so without this every record they log is lost.
+    """
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    handler = QueueHandler(log_queue)
+    handler.addFilter(CorrelationIdFilter())
+    root.addHandler(handler)
+    root.setLevel(level)
+
+
+def worker_logging_initializer() -> Tuple[Optional[Callable], tuple]:
+    """``(initializer, initargs)`` for a process pool so its workers log through the parent's handlers."""
+    global _worker_queue, _worker_listener
+    if not _handlers:
+        return None, ()
+    if _worker_queue is None:
+        _worker_queue = multiprocessing.Queue()
+        _worker_listener = QueueListener(_worker_queue, *_handlers, respect_handler_level=True)
+        _worker_listener.start()
+    return configure_worker_logging, (_worker_queue, logging.getLogger().level)
+
+
+def shutdown_logging() -> None:
+    """Log the suppressed-message summary and flush the background listener."""
+    global _listener, _worker_listener
+    if _listener is None:
+        return
+    if _rate_limiter is not None:
+        for site, count in _rate_limiter.summary().items():
+            logging.getLogger(__name__).info(f"Rate-limited {count} log message(s) from {site}")
+    if _worker_listener is not None:
+        _worker_listener.stop()
+        _worker_listener = None
+    _listener.stop()
+    _listener = None
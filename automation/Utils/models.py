@@ -0,0 +1,99 @@
+from dataclasses import dataclass, field, fields
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+from .functions import (
+    instructor_is_valid, extract_document_filenames, extract_certification_keys
+)
+
+
+def normalize_email(email) -> str:
+    return str(email or "").strip().lower()
+
+
+@dataclass(slots=True)
+class InstructorRecord:
+    """One Enrollware instructor as scraped from the user-edit page.
+
+    ``to_payload`` is the single place where the instructors/store form body is built.
+    """
+
+    url: str = ""
+    username: str = ""
+    training_site_id: Optional[str] = None
+    first_name: str = ""
+    last_name: str = ""
+    address_line_1: str = ""
+    address_line_2: str = ""
+    city: str = ""
+    state_province_region: str = ""
+    country_id: str = ""
+    mobile_phone: str = ""
+    email: str = ""
+    zip_postal_code: str = ""
+    name_to_print_on_card: str = ""
+    aha_instructor_id: str = ""
+    hsi_instructor_id: str = ""
+    rclc_username: str = ""
+    password: str = ""
+    active_user: str = "0"
+    read_only_user: str = "0"
+    allow_bid_on_open_classes: str = "0"
+    roles: Tuple[int, ...] = ()
+    email_key: str = field(init=False, default="")
+
+    def __post_init__(self) -> None:
+        self.email_key = normalize_email(self.email)
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.first_name} {self.last_name}".strip()
+
+    def to_payload(self) -> dict:
+        payload = {name: getattr(self, name) for name in PAYLOAD_FIELDS}
+        # Add the roles key only if the list isn't empty
+        if self.roles:
+            payload["roles[]"] = list(self.roles)
+        return payload
+
+    def missing_fields(self) -> list:
+        return instructor_is_valid(self.to_payload())
+
+    def log_row(self, reason: str, files: str = "") -> dict:
+        """Row for instructors_skipped.csv."""
+        return {"name": self.full_name, "email": self.email, "username": self.username, "files": files, "reason": reason}
+
+
+# Form fields sent to instructors/store, in declaration order.
+PAYLOAD_FIELDS = tuple(f.name for f in fields(InstructorRecord) if f.init and f.name not in ("url", "roles"))
+
+
+@dataclass(slots=True, frozen=True)
+class RemoteInstructor:
+    """Compact view of an Enroll Nationwide instructor with pre-normalized lookup keys."""
+
+    id: str
+    email_key: str
+    document_names: FrozenSet[str] = frozenset()
+    certification_keys: FrozenSet[tuple] = frozenset()
+
+    @classmethod
+    def from_entry(cls, entry: dict) -> "RemoteInstructor":
+        return cls(
+            id=str(entry.get("id") or "").strip(),
+            email_key=normalize_email(entry.get("email")),
+            document_names=frozenset(extract_document_filenames(entry.get("documents"))),
+            certification_keys=frozenset(extract_certification_keys(entry.get("certifications"))),
+        )
+
+    def has_document(self, file_name: str) -> bool:
+        return file_name.strip().lower() in self.document_names
+
+
+def index_remote_instructors(entries: Iterable) -> Dict[str, RemoteInstructor]:
+    """RemoteInstructors from an instructors list response, keyed by ``email_key`` (first entry wins)."""
+    index: Dict[str, RemoteInstructor] = {}
+    for entry in entries:
+        if isinstance(entry, dict):
+            remote = RemoteInstructor.from_entry(entry)
+            if remote.email_key:
+                index.setdefault(remote.email_key, remote)
+    return index
@@ -0,0 +1,212 @@
+import io
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+from .logging_setup import worker_logging_initializer
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional; images are uploaded as-is without it
+    Image = None
+    ImageOps = None
+
+try:
+    import pikepdf
+except ImportError:  # pikepdf is optional; PDFs are uploaded as-is without it
+    pikepdf = None
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".bmp", ".tif", ".tiff"}
+PDF_EXTENSIONS = {".pdf"}
+MAX_IMAGE_DIMENSION = 2000
+JPEG_QUALITY_STEPS = (85, 75, 65, 55)
+# (max embedded image dimension, JPEG quality) passes tried until a PDF meets the target size.
+PDF_IMAGE_STEPS = ((2000, 85), (1600, 75), (1200, 65), (800, 55))
+
+
+def optimization_enabled() -> bool:
+    return str(os.getenv("OPTIMIZE_DOCUMENTS") or "").strip().lower() in ("1", "true", "yes")
+
+
+def get_optimize_target_bytes() -> Optional[int]:
+    """Target size ceiling from OPTIMIZE_TARGET_SIZE_MB, falling back to MAX_UPLOAD_SIZE_MB."""
+    raw = str(os.getenv("OPTIMIZE_TARGET_SIZE_MB") or os.getenv("MAX_UPLOAD_SIZE_MB") or "").strip()
+    if not raw:
+        return None
+    try:
+        return int(float(raw) * 1024 * 1024)
+    except ValueError:
+        logger.warning(f"Ignoring invalid optimize target size: {raw}")
+        return None
+
+
+def is_optimizable(file_name: str) -> bool:
+    """True if ``file_name`` is a type the installed libraries can shrink."""
+    extension = os.path.splitext(file_name)[1].lower()
+    if extension in IMAGE_EXTENSIONS:
+        return Image is not None
+    if extension in PDF_EXTENSIONS:
+        return pikepdf is not None
+    return False
+
+
+def _fit_dimensions(width: int, height: int, max_dimension: int) -> tuple:
+    scale = min(1.0, max_dimension / float(max(width, height)))
+    return max(1, int(width * scale)), max(1, int(height * scale))
+
+
+def _encode_image(image, image_format: str, quality: int) -> bytes:
+    buffer = io.BytesIO()
+    if image_format == "JPEG":
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        image.save(buffer, format="JPEG", quality=quality, optimize=True, progressive=True)
+    elif image_format == "PNG":
+        image.save(buffer, format="PNG", optimize=True)
+    else:
+        image.save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def _optimize_image(path: str, target_bytes: Optional[int]) -> Optional[bytes]:
+    if Image is None:
+        return None
+    with Image.open(path) as source:
+        # Multi-page TIFFs, animations and MPO stereo pairs would lose every frame but the first.
+        if getattr(source, "n_frames", 1) > 1:
+            logger.info(f"Leaving multi-frame image {os.path.basename(path)} as-is")
+            return None
+        image_format = source.format or "JPEG"
+        image = ImageOps.exif_transpose(source)
+        image.load()
+    max_dimension = MAX_IMAGE_DIMENSION
+    while True:
+        size = _fit_dimensions(image.width, image.height, max_dimension)
+        resized = image.resize(size, Image.LANCZOS) if size != image.size else image
+        if image_format == "JPEG":
+            data = b""
+            for quality in JPEG_QUALITY_STEPS:
+                data = _encode_image(resized, image_format, quality)
+                if target_bytes is None or len(data) <= target_bytes:
+                    break
+        elif image_format == "PNG" and target_bytes is not None and resized.mode == "RGB":
+            data = _encode_image(resized, image_format, 0)
+            if len(data) > target_bytes:
+                data = _encode_image(resized.quantize(256), image_format, 0)
+        else:
+            data = _encode_image(resized, image_format, 0)
+        # Keep shrinking the resolution until the ceiling is met or the image gets tiny.
+        if target_bytes is None or len(data) <= target_bytes or max_dimension <= 800:
+            return data
+        max_dimension = int(max(size) * 0.75)
+
+
+def _downsample_pdf_images(pdf, max_dimension: int, quality: int) -> None:
+    for page in pdf.pages:
+        for _, raw_image in page.images.items():
+            try:
+                pdf_image = pikepdf.PdfImage(raw_image)
+                if max(pdf_image.width, pdf_image.height) <= max_dimension:
+                    continue
+                pil_image = pdf_image.as_pil_image()
+                if pil_image.mode not in ("RGB", "L"):
+                    continue
+                size = _fit_dimensions(pil_image.width, pil_image.height, max_dimension)
+                pil_image = pil_image.resize(size, Image.LANCZOS)
+                data = _encode_image(pil_image, "JPEG", quality)
+                raw_image.write(data, filter=pikepdf.Name.DCTDecode)
+                raw_image.Width, raw_image.Height = size
+                raw_image.BitsPerComponent = 8
+                raw_image.ColorSpace = pikepdf.Name.DeviceRGB if pil_image.mode == "RGB" else pikepdf.Name.DeviceGray
+                if "/DecodeParms" in raw_image:
+                    del raw_image.DecodeParms
+            except Exception as e:
+                logger.warning(f"Could not downsample embedded PDF image: {e}")
+
+
+def _optimize_pdf(path: str, target_bytes: Optional[int]) -> Optional[bytes]:
+    if pikepdf is None:
+        return None
+    steps = PDF_IMAGE_STEPS if Image is not None else ((None, None),)
+    data = None
+    for max_dimension, quality in steps:
+        # Each pass starts from the original so images are never recompressed twice.
+        with pikepdf.open(path) as pdf:
+            if max_dimension is not None:
+                _downsample_pdf_images(pdf, max_dimension, quality)
+            buffer = io.BytesIO()
+            pdf.save(
+                buffer,
+                linearize=True,
+                compress_streams=True,
+                object_stream_mode=pikepdf.ObjectStreamMode.generate,
+            )
+        if data is None or len(buffer.getvalue()) < len(data):
+            data = buffer.getvalue()
+        if target_bytes is None or len(data) <= target_bytes:
+            break
+    return data
+
+
+def optimize_document(path: str, target_bytes: Optional[int] = None) -> int:
+    """Shrink a downloaded document in place; return the number of bytes saved.
+
+    The file keeps its name and extension so filename-based remote deduplication is
+    unaffected. The original is kept whenever the optimized copy is not smaller.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    original_size = os.path.getsize(path)
+    try:
+        if extension in IMAGE_EXTENSIONS:
+            data = _optimize_image(path, target_bytes)
+        elif extension in PDF_EXTENSIONS:
+            data = _optimize_pdf(path, target_bytes)
+        else:
+            return 0
+    except Exception as e:
+        logger.warning(f"Could not optimize {os.path.basename(path)}: {e}")
+        return 0
+
+    if not data or len(data) >= original_size:
+        return 0
+    temp_path = f"{path}.optimizing"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, path)
+    return original_size - len(data)
+
+
+def get_optimize_workers() -> Optional[int]:
+    raw = str(os.getenv("OPTIMIZE_WORKERS") or "").strip()
+    return int(raw) if raw.isdigit() and int(raw) > 0 else None
+
+
+def create_optimize_pool() -> Optional[ProcessPoolExecutor]:
+    """Process pool for the optimization stage, or None when it is disabled or unavailable."""
+    if not optimization_enabled():
+        return None
+    if Image is None and pikepdf is None:
+        logger.warning("OPTIMIZE_DOCUMENTS is set but neither Pillow nor pikepdf is installed")
+        return None
+    initializer, initargs = worker_logging_initializer()
+    return ProcessPoolExecutor(max_workers=get_optimize_workers(), initializer=initializer, initargs=initargs)
+
+
+def optimize_documents(executor: ProcessPoolExecutor, paths: List[str], target_bytes: Optional[int] = None) -> Dict[str, int]:
+    """Optimize documents on the process pool; return bytes saved per path."""
+    results: Dict[str, int] = {}
+    if not paths:
+        return results
+    futures = {path: executor.submit(optimize_document, path, target_bytes) for path in paths}
+    for path, future in futures.items():
+        try:
+            results[path] = future.result()
+        except Exception as e:
+            logger.warning(f"Optimization worker failed for {os.path.basename(path)}: {e}")
+            results[path] = 0
+        if results[path]:
+            logger.info(f"Optimized {os.path.basename(path)}: saved {results[path]} bytes")
+    logger.info(f"Document optimization saved {sum(results.values())} bytes across {len(paths)} file(s)")
+    return results
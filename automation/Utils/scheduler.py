@@ -0,0 +1,111 @@
+import os
+import json
+import time
+import logging
+from typing import Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+SCHEDULE_MODES = ("dom", "sjf", "new-first", "value")
+
+# Cost model defaults (seconds) used until an instructor has been timed in a previous run.
+BASE_PAGE_SECONDS = 8.0
+SECONDS_PER_DOCUMENT = 3.0
+ASSUMED_BYTES_PER_SECOND = 2 * 1024 * 1024
+# The cache holds every instructor, so it is rewritten at most this often (and once at exit).
+SAVE_INTERVAL_SECONDS = 60.0
+
+
+class InstructorScheduler:
+    """Order instructor URLs by estimated cost and value and enforce a run time budget.
+
+    Per-URL stats (email, active flag, missing document count/bytes, last duration) are
+    learned while processing and persisted, so later runs can plan before opening pages.
+    """
+
+    def __init__(self, cache_path: str, mode: str = "sjf", max_duration: Optional[float] = None) -> None:
+        if mode not in SCHEDULE_MODES:
+            raise ValueError(f"Unknown schedule mode {mode!r}; expected one of {SCHEDULE_MODES}")
+        self.cache_path = cache_path
+        self.mode = mode
+        self.max_duration = max_duration
+        self.remote_emails: Set[str] = set()
+        self.started_at = time.monotonic()
+        self.saved_at = self.started_at
+        self.stats: Dict[str, dict] = self._load()
+
+    def _load(self) -> Dict[str, dict]:
+        if not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable schedule cache {self.cache_path}: {e}")
+            return {}
+
+    def save(self) -> None:
+        temp_path = f"{self.cache_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.stats, f)
+        os.replace(temp_path, self.cache_path)
+        self.saved_at = time.monotonic()
+
+    def save_if_due(self, interval: float = SAVE_INTERVAL_SECONDS) -> None:
+        if time.monotonic() - self.saved_at >= interval:
+            self.save()
+
+    def set_remote_emails(self, emails: Iterable[str]) -> None:
+        self.remote_emails = {str(email).strip().lower() for email in emails if email}
+
+    def is_new(self, url: str) -> bool:
+        email = str(self.stats.get(url, {}).get("email") or "").strip().lower()
+        # Unknown instructors are treated as new: they are the ones a run most needs to reach.
+        return not email or email not in self.remote_emails
+
+    def estimate_cost(self, url: str) -> float:
+        stats = self.stats.get(url, {})
+        if stats.get("seconds"):
+            return float(stats["seconds"])
+        documents = int(stats.get("missing_docs") or 0)
+        size = int(stats.get("missing_bytes") or 0)
+        return BASE_PAGE_SECONDS + documents * SECONDS_PER_DOCUMENT + size / ASSUMED_BYTES_PER_SECOND
+
+    def estimate_value(self, url: str) -> float:
+        stats = self.stats.get(url, {})
+        value = 2.0 if self.is_new(url) else 1.0
+        if stats.get("active") == "0":
+            value *= 0.5
+        if stats.get("missing_docs"):
+            value += 0.5
+        return value
+
+    def order(self, urls: List[str]) -> List[str]:
+        """Return ``urls`` in processing order for the configured mode (stable for ties)."""
+        if self.mode == "sjf":
+            ordered = sorted(urls, key=self.estimate_cost)
+        elif self.mode == "new-first":
+            ordered = sorted(urls, key=lambda url: (not self.is_new(url), self.estimate_cost(url)))
+        elif self.mode == "value":
+            ordered = sorted(urls, key=lambda url: -self.estimate_value(url) / self.estimate_cost(url))
+        else:
+            ordered = list(urls)
+        logger.info(f"Scheduled {len(ordered)} instructor(s) in '{self.mode}' order, "
+                    f"estimated {sum(map(self.estimate_cost, ordered)) / 60:.1f} min")
+        return ordered
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def has_time_for(self, url: str) -> bool:
+        """True if the next instructor is expected to finish inside the time budget."""
+        if self.max_duration is None:
+            return True
+        return self.elapsed() + self.estimate_cost(url) <= self.max_duration
+
+    def record(self, url: str, seconds: Optional[float] = None, **stats) -> None:
+        entry = self.stats.setdefault(url, {})
+        entry.update({key: value for key, value in stats.items() if value is not None})
+        if seconds is not None:
+            entry["seconds"] = round(seconds, 2)
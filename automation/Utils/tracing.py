@@ -0,0 +1,106 @@
+import os
+import json
+import time
+import pstats
+import logging
+import cProfile
+import functools
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Tracer:
+    """Opt-in span recorder exported in Chrome trace-event format (chrome://tracing, Perfetto).
+
+    Disabled by default; ``span`` is then a near no-op so instrumentation can stay
+    in hot paths permanently.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.output_path: Optional[str] = None
+        self._events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def enable(self, output_path: str) -> None:
+        self.enabled = True
+        self.output_path = output_path
+        logger.info(f"Tracing enabled, spans will be written to {output_path}")
+
+    @contextmanager
+    def span(self, name: str, category: str = "op", **args: Any) -> Iterator[Dict[str, Any]]:
+        """Record the duration of the enclosed block; yields a dict for extra span args."""
+        if not self.enabled:
+            yield args
+            return
+        start = time.perf_counter()
+        try:
+            yield args
+        except BaseException as e:
+            args["error"] = repr(e)
+            raise
+        finally:
+            end = time.perf_counter()
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": int(start * 1_000_000),
+                "dur": int((end - start) * 1_000_000),
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+                "args": {key: str(value) for key, value in args.items()},
+            }
+            with self._lock:
+                self._events.append(event)
+
+    def export(self, output_path: Optional[str] = None) -> Optional[str]:
+        """Write recorded spans as ``{"traceEvents": [...]}`` JSON; return the file path."""
+        path = output_path or self.output_path
+        if not self.enabled or not path:
+            return None
+        with self._lock:
+            events = list(self._events)
+        metadata = {"name": "process_name", "ph": "M", "pid": os.getpid(), "args": {"name": "enrollware-sync"}}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": [metadata] + events, "displayTimeUnit": "ms"}, f)
+        logger.info(f"Wrote {len(events)} trace spans to {path}")
+        return path
+
+
+tracer = Tracer()
+
+
+def traced(name: str, category: str = "op"):
+    """Decorator form of ``tracer.span`` for whole-function spans."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with tracer.span(name, category):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def profile_block(stats_path: str, top: int = 25) -> Iterator[None]:
+    """Run the enclosed block under cProfile, dump stats and log the top hotspots."""
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(stats_path)
+        stats = pstats.Stats(profiler)
+        logger.info(f"Profile written to {stats_path}; top {top} functions by cumulative time:")
+        for (file_name, line, func_name), (_, calls, own_time, cumulative, _) in list(
+            sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+        )[:top]:
+            logger.info(
+                f"  {cumulative:8.3f}s cum  {own_time:8.3f}s own  {calls:7d} calls  "
+                f"{func_name} ({os.path.basename(file_name)}:{line})"
+            )
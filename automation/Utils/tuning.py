@@ -0,0 +1,44 @@
+import os
+import json
+import logging
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+# Tuned setting -> environment variable read by the code that uses it.
+SETTING_ENV_VARS = {
+    "certification_concurrency": "CERTIFICATION_CONCURRENCY",
+    "download_workers": "DOWNLOAD_WORKERS",
+    "upload_chunk_kb": "UPLOAD_CHUNK_KB",
+}
+
+
+def load_tuned_profile(path: str) -> Dict[str, int]:
+    """Read the ``settings`` section of a profile written by autotune.py (empty if absent)."""
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            settings = json.load(f).get("settings", {})
+    except (OSError, ValueError, AttributeError) as e:
+        logger.warning(f"Ignoring unreadable tuned profile {path}: {e}")
+        return {}
+    return {key: value for key, value in settings.items() if key in SETTING_ENV_VARS and isinstance(value, int)}
+
+
+def apply_tuned_profile(path: str) -> Dict[str, int]:
+    """Use tuned settings as defaults for their environment variables.
+
+    Values already set in the environment (or .env) win over the profile, so a single
+    knob can still be overridden by hand. Returns the settings that were applied.
+    """
+    applied = {}
+    for key, value in load_tuned_profile(path).items():
+        env_var = SETTING_ENV_VARS[key]
+        if str(os.getenv(env_var) or "").strip():
+            continue
+        os.environ[env_var] = str(value)
+        applied[key] = value
+    if applied:
+        logger.info(f"Loaded tuned profile {path}: " + ", ".join(f"{key}={value}" for key, value in applied.items()))
+    return applied
@@ -1,23 +1,18 @@
 from selenium import webdriver
 import time
 import logging
-import os
 from typing import Optional
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.select import Select
 from selenium.common.exceptions import (
     TimeoutException, NoSuchElementException, WebDriverException,
     ElementNotInteractableException, StaleElementReferenceException
 )
+from .driver_bootstrap import start_driver
 
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 
@@ -89,89 +84,8 @@ def input_element(driver, by_locator, text: str, timeout: int = 10) -> bool:
 
 
 def get_undetected_driver(headless: bool = True, max_retries: int = 3) -> Optional[webdriver.Chrome]:
-    """Create undetected Chrome driver with comprehensive error handling."""
-    for attempt in range(max_retries):
-        driver = None
-        try:
-            options = webdriver.ChromeOptions()
-            path = rf'{BASE_DIR}\chrome-dir'
-
-            # Ensure chrome-dir exists
-            if not os.path.exists(path):
-                try:
-                    os.makedirs(path, exist_ok=True)
-                    logger.info(f"Created chrome directory: {path}")
-                except OSError as e:
-                    logger.error(f"Failed to create chrome directory: {e}")
-                    path = None
-
-            if path:
-                options.add_argument(f'--user-data-dir={path}')
-
-            # Enhanced options for stability
-            options.add_argument("--log-level=3")
-            options.add_argument("--no-sandbox")
-            options.add_argument("--disable-blink-features=AutomationControlled")
-            options.add_argument("--disable-extensions")
-            options.add_argument("--disable-plugins")
-            options.add_argument("--disable-images")
-            options.add_argument("--disable-javascript")
-            options.add_argument("--disable-dev-shm-usage")
-            options.add_argument("--disable-background-timer-throttling")
-            options.add_argument("--disable-backgrounding-occluded-windows")
-            options.add_argument("--disable-renderer-backgrounding")
-            options.add_argument("--disable-features=TranslateUI")
-            options.add_argument("--disable-ipc-flooding-protection")
-
-            if headless:
-                options.add_argument("--headless")
-                options.add_argument("--disable-gpu")
-                options.add_argument("--window-size=1920,1080")
-            else:
-                options.add_argument("--start-maximized")
-
-            # Experimental options for better stability
-            options.add_experimental_option("excludeSwitches", ["enable-automation"])
-            options.add_experimental_option('useAutomationExtension', False)
-
-            # Initialize Chrome driver
-            driver_path = f"{BASE_DIR}/chrome.exe"
-            # service = Service(ChromeDriverManager().install())
-            # driver = webdriver.Chrome(service=service, options=options)
-            driver = webdriver.Chrome(service=Service(path=driver_path), options=options)
-            # Allow the browser to fully initialize
-            time.sleep(3)
-
-            # Enhanced fingerprinting protection
-            stealth_js = """
-            Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
-            Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]});
-            Object.defineProperty(navigator, 'languages', {get: () => ['en-US', 'en']});
-            window.chrome = {runtime: {}};
-            """
-            driver.execute_script(stealth_js)
-
-            # Test driver functionality
-            driver.get("data:,")
-            logger.info(f"Chrome driver initialized successfully (attempt {attempt + 1})")
-            return driver
-
-        except Exception as e:
-            logger.error(f"Driver creation attempt {attempt + 1} failed: {e}")
-            if driver:
-                try:
-                    driver.quit()
-                except:
-                    pass
-
-            if attempt < max_retries - 1:
-                logger.info(f"Retrying driver creation... Attempts left: {max_retries - attempt - 1}")
-                time.sleep(3)
-            else:
-                logger.error("Max retries exceeded. Could not create the driver.")
-                return None
-
-    return None
+    """Create undetected Chrome driver with comprehensive error handling (see driver_bootstrap)."""
+    return start_driver(headless=headless, max_retries=max_retries)
 
 
 def check_element_exists(driver, by_locator, timeout: int = 3) -> bool:
@@ -270,7 +184,7 @@ def get_element_text(driver, by_locator, timeout: int = 1, default: str = "") ->
         text = element.text.strip()
         return text if text else default
     except TimeoutException:
-        logger.warning(f"Element not found for text extraction within {timeout} seconds: {by_locator}")
+        logger.warning(f"Element not found for text extraction within {timeout} seconds: {by_locator}", extra={"rate_limited": True})
         return default
     except (NoSuchElementException, WebDriverException) as e:
         logger.error(f"Error getting element text: {e}")
@@ -286,7 +200,8 @@ def get_element_attribute(driver, by_locator, attribute: str, timeout: int = 1)
         element = WebDriverWait(driver, timeout).until(EC.visibility_of_element_located(by_locator))
         return element.get_attribute(attribute)
     except TimeoutException:
-        logger.error(f"Element not found within {timeout} seconds: {by_locator}")
+        # Optional form fields are routinely absent; this is not an error.
+        logger.warning(f"Element not found within {timeout} seconds: {by_locator}", extra={"rate_limited": True})
         return ''
     except WebDriverException as e:
         logger.error(f"Error getting element attribute: {e}")
@@ -1,33 +1,73 @@
+import logging
 import requests
 from urllib.parse import urljoin
 from .api_headers import get_headers
-from typing import Any, Dict, Iterable, Optional, Tuple, Union
+from .multipart import StreamingMultipartEncoder, ProgressCallback, get_upload_chunk_size
+from .circuit_breaker import CircuitBreaker
+from .rate_limiter import RateLimiter
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
 
 
 DEFAULT_BASE_URL = "https://api.enrollnationwide.com/api/"
+# (connect, read) seconds; a hung request fails and counts against the circuit breaker.
+DEFAULT_TIMEOUT = (10, 60)
+UPLOAD_TIMEOUT = (10, 300)
+
+
+def is_outage_status(status_code: int) -> bool:
+    """Statuses that indicate the API itself is unhealthy (count against the circuit breaker)."""
+    return status_code >= 500 or status_code == 429
+
+
+def error_detail(response: Any) -> str:
+    """Best-effort error message from a failed API response (requests or httpx)."""
+    if response is None:
+        return ""
+    try:
+        payload = response.json()
+        if isinstance(payload, dict):
+            return str(payload.get("message") or payload.get("error") or payload)
+        return str(payload)
+    except ValueError:
+        return response.text.strip()
 
 
 class APIClient:
     """Lightweight client to hit any enrollnationwide API endpoint."""
 
-    def __init__(self, base_url: str = DEFAULT_BASE_URL) -> None:
+    def __init__(
+        self,
+        base_url: str = DEFAULT_BASE_URL,
+        breaker: Optional[CircuitBreaker] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+    ) -> None:
         self.base_url = base_url.rstrip("/") + "/"
+        self.timeout = timeout
         self.session = requests.Session()
         self.session.headers.update(get_headers())
+        self.breaker = breaker or CircuitBreaker()
+        self.rate_limiter = rate_limiter
 
     def request(
         self,
         method: str,
         endpoint: str,
         *,
-        payload: Optional[Dict[str, Any]] = None,
+        payload: Optional[Union[Dict[str, Any], StreamingMultipartEncoder]] = None,
         json: Optional[Dict[str, Any]] = None,
         params: Optional[Dict[str, Any]] = None,
         files: Optional[Dict[str, Any]] = None,
         headers: Optional[Dict[str, str]] = None,
         expected_status: Union[int, Iterable[int]] = (200, 201),
+        timeout: Optional[Tuple[float, float]] = None,
     ) -> Any:
         url = urljoin(self.base_url, endpoint.lstrip("/"))
+        self.breaker.before_call()
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
         try:
             response = self.session.request(
                 method=method.upper(),
@@ -37,7 +77,12 @@ class APIClient:
                 params=params,
                 files=files,
                 headers=headers,
+                timeout=timeout or self.timeout,
             )
+            if is_outage_status(response.status_code):
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
             response.raise_for_status()
 
             expected: Tuple[int, ...] = tuple(expected_status) if isinstance(expected_status, Iterable) else (expected_status,)
@@ -48,22 +93,17 @@ class APIClient:
 
             return self._parse_response(response)
         except requests.HTTPError as exc:
-            response = exc.response
-            detail = ""
-            if response is not None:
-                try:
-                    payload = response.json()
-                    if isinstance(payload, dict):
-                        detail = str(payload.get("message") or payload.get("error") or payload)
-                    else:
-                        detail = str(payload)
-                except ValueError:
-                    detail = response.text.strip()
+            detail = error_detail(exc.response)
             suffix = f": {detail}" if detail else ""
             raise RuntimeError(f"API request to {url} failed{suffix}") from exc
         except requests.RequestException as exc:
+            self.breaker.record_failure()
             raise RuntimeError(f"API request to {url} failed") from exc
 
+    def async_headers(self) -> Dict[str, str]:
+        """Session headers for an AsyncAPIClient talking to the same API (hop-by-hop headers dropped)."""
+        return {key: value for key, value in self.session.headers.items() if key.lower() != "connection"}
+
     def get(self, endpoint: str, **kwargs: Any) -> Any:
         return self.request("GET", endpoint, **kwargs)
 
@@ -76,8 +116,36 @@ class APIClient:
     def delete(self, endpoint: str, **kwargs: Any) -> Any:
         return self.request("DELETE", endpoint, **kwargs)
 
+    def post_multipart(
+        self,
+        endpoint: str,
+        *,
+        payload: Optional[Dict[str, Any]] = None,
+        files: List[Tuple[str, Tuple[str, str]]],
+        progress_callback: Optional[ProgressCallback] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """POST form fields and files as a streamed multipart body.
+
+        ``files`` is a list of ``(field, (file_name, file_path))``; files are read from
+        disk in chunks while sending, so memory use does not grow with file size.
+        """
+        with StreamingMultipartEncoder(
+            payload, files, chunk_size=get_upload_chunk_size(), progress_callback=progress_callback
+        ) as encoder:
+            headers = dict(kwargs.pop("headers", None) or {})
+            headers["Content-Type"] = encoder.content_type
+            kwargs.setdefault("timeout", UPLOAD_TIMEOUT)
+            result = self.request("POST", endpoint, payload=encoder, headers=headers, **kwargs)
+            for part in encoder.file_parts:
+                logger.info(
+                    f"Sent {part.file_name}: {part.size} bytes in {part.elapsed:.2f}s "
+                    f"({part.throughput / 1024:.1f} KiB/s)"
+                )
+            return result
+
     @staticmethod
-    def _parse_response(response: requests.Response) -> Any:
+    def _parse_response(response: Any) -> Any:
         content_type = response.headers.get("Content-Type", "")
         if "application/json" in content_type:
             return response.json()
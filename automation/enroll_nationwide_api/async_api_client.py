@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import httpx
+from urllib.parse import urljoin
+from .api_headers import get_headers
+from .api_client import DEFAULT_BASE_URL, APIClient, error_detail, is_outage_status
+from .circuit_breaker import CircuitBreaker
+from .rate_limiter import RateLimiter
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+try:
+    import h2  # noqa: F401  (presence check; httpx needs it for HTTP/2)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 10
+
+# (method, endpoint, request kwargs) as accepted by AsyncAPIClient.request
+APICall = Tuple[str, str, Dict[str, Any]]
+
+
+class AsyncAPIClient:
+    """Asyncio counterpart of APIClient with a pooled HTTP connection and request fan-out."""
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_BASE_URL,
+        *,
+        max_connections: int = 20,
+        http2: bool = False,
+        timeout: float = 60.0,
+        breaker: Optional[CircuitBreaker] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        if http2 and not HTTP2_AVAILABLE:
+            logger.warning("HTTP/2 requested but the 'h2' package is not installed; using HTTP/1.1")
+            http2 = False
+        self.base_url = base_url.rstrip("/") + "/"
+        self.breaker = breaker or CircuitBreaker()
+        self.rate_limiter = rate_limiter
+        self.client = httpx.AsyncClient(
+            headers=headers if headers is not None else get_headers(),
+            http2=http2,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    async def request(
+        self,
+        method: str,
+        endpoint: str,
+        *,
+        payload: Optional[Dict[str, Any]] = None,
+        json: Optional[Dict[str, Any]] = None,
+        params: Optional[Union[Dict[str, Any], str]] = None,
+        files: Optional[Any] = None,
+        headers: Optional[Dict[str, str]] = None,
+        expected_status: Union[int, Iterable[int]] = (200, 201),
+    ) -> Any:
+        url = urljoin(self.base_url, endpoint.lstrip("/"))
+        self.breaker.before_call()
+        if self.rate_limiter:
+            await self.rate_limiter.acquire_async()
+        try:
+            response = await self.client.request(
+                method=method.upper(),
+                url=url,
+                data=payload,
+                json=json,
+                params=params,
+                files=files,
+                headers=headers,
+            )
+            if is_outage_status(response.status_code):
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            response.raise_for_status()
+
+            expected: Tuple[int, ...] = tuple(expected_status) if isinstance(expected_status, Iterable) else (expected_status,)
+            if expected and response.status_code not in expected:
+                raise httpx.HTTPStatusError(
+                    f"Unexpected status {response.status_code} for {url}", request=response.request, response=response
+                )
+
+            return APIClient._parse_response(response)
+        except httpx.HTTPStatusError as exc:
+            detail = error_detail(exc.response)
+            suffix = f": {detail}" if detail else ""
+            raise RuntimeError(f"API request to {url} failed{suffix}") from exc
+        except httpx.HTTPError as exc:
+            self.breaker.record_failure()
+            raise RuntimeError(f"API request to {url} failed") from exc
+
+    async def get(self, endpoint: str, **kwargs: Any) -> Any:
+        return await self.request("GET", endpoint, **kwargs)
+
+    async def post(self, endpoint: str, **kwargs: Any) -> Any:
+        return await self.request("POST", endpoint, **kwargs)
+
+    async def put(self, endpoint: str, **kwargs: Any) -> Any:
+        return await self.request("PUT", endpoint, **kwargs)
+
+    async def delete(self, endpoint: str, **kwargs: Any) -> Any:
+        return await self.request("DELETE", endpoint, **kwargs)
+
+    async def gather(self, calls: Iterable[APICall], concurrency: int = DEFAULT_CONCURRENCY) -> List[Any]:
+        """Run many API calls with at most ``concurrency`` in flight.
+
+        Results are returned in input order; a failed call yields its exception
+        (a RuntimeError, as raised by ``request``) instead of aborting the batch.
+        """
+        factories = [
+            (lambda method=method, endpoint=endpoint, kwargs=kwargs: self.request(method, endpoint, **kwargs))
+            for method, endpoint, kwargs in calls
+        ]
+        return await gather_limited(factories, concurrency)
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+    async def __aenter__(self) -> "AsyncAPIClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+
+async def gather_limited(
+    factories: Iterable[Callable[[], Awaitable[Any]]],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    return_exceptions: bool = True,
+) -> List[Any]:
+    """``asyncio.gather`` with a concurrency cap; coroutines are created lazily."""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def _run(factory: Callable[[], Awaitable[Any]]) -> Any:
+        async with semaphore:
+            return await factory()
+
+    return await asyncio.gather(*(_run(factory) for factory in factories), return_exceptions=return_exceptions)
+
+
+def run_api_calls(calls: Iterable[APICall], concurrency: int = DEFAULT_CONCURRENCY, **client_kwargs: Any) -> List[Any]:
+    """Synchronous entry point: fan out ``calls`` on a short-lived AsyncAPIClient."""
+    calls = list(calls)
+
+    async def _main() -> List[Any]:
+        async with AsyncAPIClient(max_connections=max(concurrency, 1), **client_kwargs) as client:
+            return await client.gather(calls, concurrency)
+
+    return asyncio.run(_main())
@@ -0,0 +1,117 @@
+import time
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of sending a request while the circuit is open."""
+
+
+class CircuitBreaker:
+    """Trip on consecutive failures or a high error rate, then recover through half-open probes.
+
+    Only outage-type failures count (connection errors, timeouts, 5xx, 429); validation
+    errors such as 4xx mean the API is healthy and are recorded as successes.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        error_rate_threshold: float = 0.5,
+        window_size: int = 20,
+        min_calls: int = 10,
+        recovery_timeout: float = 60.0,
+        half_open_max_calls: int = 1,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.min_calls = min_calls
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._window = deque(maxlen=window_size)
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh_state()
+            return self._state
+
+    @property
+    def is_closed(self) -> bool:
+        return self.state == self.CLOSED
+
+    def _refresh_state(self) -> None:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._state = self.HALF_OPEN
+            self._half_open_calls = 0
+            logger.info("Circuit half-open: allowing probe requests")
+
+    def _open(self) -> None:
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        logger.warning(
+            f"Circuit opened after {self._consecutive_failures} consecutive failure(s); "
+            f"pausing API calls for {self.recovery_timeout:.0f}s"
+        )
+
+    def before_call(self) -> None:
+        """Reserve a call slot or raise CircuitOpenError."""
+        with self._lock:
+            self._refresh_state()
+            if self._state == self.OPEN:
+                raise CircuitOpenError("Circuit open: API calls are paused")
+            if self._state == self.HALF_OPEN:
+                if self._half_open_calls >= self.half_open_max_calls:
+                    raise CircuitOpenError("Circuit half-open: probe already in flight")
+                self._half_open_calls += 1
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._window.append(True)
+            self._consecutive_failures = 0
+            if self._state == self.HALF_OPEN:
+                self._state = self.CLOSED
+                self._window.clear()
+                logger.info("Circuit closed: API recovered")
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._window.append(False)
+            self._consecutive_failures += 1
+            if self._state == self.HALF_OPEN:
+                self._open()
+                return
+            if self._state != self.CLOSED:
+                return
+            failures = self._window.count(False)
+            error_rate = failures / len(self._window)
+            if self._consecutive_failures >= self.failure_threshold or (
+                len(self._window) >= self.min_calls and error_rate >= self.error_rate_threshold
+            ):
+                self._open()
+
+    def seconds_until_probe(self) -> float:
+        with self._lock:
+            self._refresh_state()
+            if self._state != self.OPEN:
+                return 0.0
+            return max(0.0, self.recovery_timeout - (time.monotonic() - self._opened_at))
+
+    def wait_until_probe(self) -> None:
+        """Block while the circuit is open, returning once a probe is allowed."""
+        delay = self.seconds_until_probe()
+        if delay > 0:
+            logger.info(f"Circuit open, waiting {delay:.0f}s before probing the API")
+            time.sleep(delay)
@@ -0,0 +1,194 @@
+import os
+import time
+import uuid
+import logging
+import mimetypes
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Called with (bytes_sent, total_bytes) after every chunk handed to the socket.
+ProgressCallback = Callable[[int, int], None]
+
+
+def get_upload_chunk_size() -> int:
+    """Multipart read size from UPLOAD_CHUNK_KB, or DEFAULT_CHUNK_SIZE."""
+    raw = str(os.getenv("UPLOAD_CHUNK_KB") or "").strip()
+    if raw.isdigit() and int(raw) > 0:
+        return int(raw) * 1024
+    if raw:
+        logger.warning(f"Ignoring invalid UPLOAD_CHUNK_KB value: {raw}")
+    return DEFAULT_CHUNK_SIZE
+
+
+def _header_param(name: str, value: str) -> str:
+    """``name="value"`` for Content-Disposition, percent-encoding ``\\n``, ``\\r`` and ``"`` like urllib3 (WHATWG)."""
+    return f'{name}="{str(value).translate({10: "%0A", 13: "%0D", 34: "%22"})}"'
+
+
+class _FilePart:
+    """Single file field of a multipart body, read lazily from disk."""
+
+    def __init__(self, field: str, file_name: str, fh: BinaryIO, size: int, header: bytes) -> None:
+        self.field = field
+        self.file_name = file_name
+        self.fh = fh
+        self.size = size
+        self.header = header
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds spent streaming this file, 0.0 until the part has been fully sent."""
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        """Bytes per second for this file."""
+        return self.size / max(self.elapsed, 1e-6) if self.finished_at is not None else 0.0
+
+
+class StreamingMultipartEncoder:
+    """Generate a multipart/form-data body in chunks with a known Content-Length.
+
+    The instance is a file-like object (``read``/``__len__``/``__iter__``) so it can be
+    passed straight to ``requests`` as ``data=`` and the body is never held in memory.
+    """
+
+    def __init__(
+        self,
+        fields: Optional[Dict[str, Any]] = None,
+        files: Optional[List[Tuple[str, Tuple[str, str]]]] = None,
+        *,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        progress_callback: Optional[ProgressCallback] = None,
+    ) -> None:
+        self.boundary = uuid.uuid4().hex
+        self.chunk_size = chunk_size
+        self.progress_callback = progress_callback
+        self.bytes_sent = 0
+        self._segments: List[Any] = []
+        self._file_parts: List[_FilePart] = []
+        self._segment_index = 0
+        self._buffer = b""
+
+        for name, value in (fields or {}).items():
+            values = value if isinstance(value, (list, tuple)) else [value]
+            for item in values:
+                self._segments.append(self._field_bytes(name, item))
+
+        for field, (file_name, file_path) in files or []:
+            self._add_file(field, file_name, file_path)
+
+        self._segments.append(f"--{self.boundary}--\r\n".encode("utf-8"))
+        self.total_size = sum(
+            len(seg) if isinstance(seg, bytes) else len(seg.header) + seg.size + 2
+            for seg in self._segments
+        )
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    @property
+    def file_parts(self) -> List[_FilePart]:
+        return list(self._file_parts)
+
+    def _field_bytes(self, name: str, value: Any) -> bytes:
+        return (
+            f"--{self.boundary}\r\n"
+            f"Content-Disposition: form-data; {_header_param('name', name)}\r\n\r\n"
+            f"{'' if value is None else value}\r\n"
+        ).encode("utf-8")
+
+    def _add_file(self, field: str, file_name: str, file_path: str) -> None:
+        mime_type = mimetypes.guess_type(file_name)[0] or "application/octet-stream"
+        header = (
+            f"--{self.boundary}\r\n"
+            f"Content-Disposition: form-data; {_header_param('name', field)}; {_header_param('filename', file_name)}\r\n"
+            f"Content-Type: {mime_type}\r\n\r\n"
+        ).encode("utf-8")
+        fh = open(file_path, "rb")
+        size = os.fstat(fh.fileno()).st_size
+        part = _FilePart(field, file_name, fh, size, header)
+        self._file_parts.append(part)
+        self._segments.append(part)
+
+    def __len__(self) -> int:
+        return self.total_size
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            chunk = self.read(self.chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def _next_bytes(self, size: int) -> bytes:
+        """Return up to ``size`` bytes from the current segment, advancing as needed."""
+        while self._segment_index < len(self._segments):
+            segment = self._segments[self._segment_index]
+            if isinstance(segment, bytes):
+                self._segment_index += 1
+                return segment
+            if segment.started_at is None:
+                segment.started_at = time.perf_counter()
+                return segment.header
+            data = segment.fh.read(size)
+            if data:
+                return data
+            segment.finished_at = time.perf_counter()
+            segment.fh.close()
+            self._segment_index += 1
+            return b"\r\n"
+        return b""
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = self.total_size
+        while len(self._buffer) < size:
+            # HTTP libraries read in their own small blocks; read ahead chunk_size from disk.
+            data = self._next_bytes(max(size - len(self._buffer), self.chunk_size))
+            if not data:
+                break
+            self._buffer += data
+        chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        if chunk:
+            self.bytes_sent += len(chunk)
+            if self.progress_callback:
+                try:
+                    self.progress_callback(self.bytes_sent, self.total_size)
+                except Exception as e:
+                    logger.warning(f"Upload progress callback failed: {e}")
+        return chunk
+
+    def close(self) -> None:
+        for part in self._file_parts:
+            if not part.fh.closed:
+                part.fh.close()
+
+    def __enter__(self) -> "StreamingMultipartEncoder":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def log_upload_progress(label: str, step_percent: int = 25) -> ProgressCallback:
+    """Build a progress callback that logs every ``step_percent`` of an upload."""
+    state = {"next": step_percent}
+
+    def _callback(sent: int, total: int) -> None:
+        if not total:
+            return
+        percent = sent * 100 // total
+        if percent >= state["next"]:
+            logger.info(f"Uploading {label}: {percent}% ({sent}/{total} bytes)")
+            state["next"] = (percent // step_percent + 1) * step_percent
+
+    return _callback
@@ -0,0 +1,56 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """Token bucket shared by the sync and async API clients.
+
+    ``reserve`` takes a token under a thread lock and returns how long the caller must
+    wait before sending, so one instance can pace requests from threads and from any
+    number of short-lived event loops alike.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self) -> None:
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        delay = self.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+
+def create_rate_limiter() -> Optional[RateLimiter]:
+    """Limiter for API_RATE_LIMIT requests/second, or None when it is not set."""
+    raw = str(os.getenv("API_RATE_LIMIT") or "").strip()
+    if not raw:
+        return None
+    try:
+        return RateLimiter(float(raw))
+    except ValueError:
+        logger.warning(f"Ignoring invalid API_RATE_LIMIT value: {raw}")
+        return None
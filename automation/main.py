@@ -1,30 +1,58 @@
 import os
 import csv
 import sys
+import signal
+import argparse
+import contextvars
+import functools
+import json
 import time
-import shutil
 import logging
-import requests
-import mimetypes
 from typing import Optional
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from urllib.parse import urlsplit
 from selenium.webdriver.common.by import By
 from enroll_nationwide_api.api_client import APIClient
+from enroll_nationwide_api.circuit_breaker import CircuitOpenError
+from enroll_nationwide_api.async_api_client import run_api_calls
+from enroll_nationwide_api.rate_limiter import create_rate_limiter
 from enroll_nationwide_api.api_endpoints import APIEndpoints
-from Utils.utils import get_undetected_driver, get_element_text
+from enroll_nationwide_api.multipart import log_upload_progress
+from Utils.utils import get_element_text
+from Utils.driver_manager import DriverManager, DRIVER_ERRORS, is_dead_driver_error
+from Utils.downloads import get_max_upload_bytes, get_download_workers, preflight_files, DownloadSession
+from Utils.optimize import create_optimize_pool, optimize_documents, get_optimize_target_bytes, is_optimizable
+from Utils.tracing import tracer, traced, profile_block
+from Utils.dead_letter import DeadLetterQueue
+from Utils.scheduler import InstructorScheduler, SCHEDULE_MODES
+from Utils.instructor_index import InstructorIndex
+from Utils.logging_setup import configure_logging, log_context
+from Utils.tuning import apply_tuned_profile
+from Utils.models import InstructorRecord, RemoteInstructor, index_remote_instructors, normalize_email
 from Utils.functions import (
-    login_to_enrollware_and_navigate_to_instructor_records,
+    login_to_enrollware_and_navigate_to_instructor_records, show_all_instructor_rows,
+    enumerate_instructor_rows, enumerate_instructor_rows_from_dom,
     get_element_value, get_checkbox_value, extract_instructors_list,
-    instructor_is_valid, get_best_match_id, extract_document_filenames,
-    extract_response_message
+    get_best_match_id, extract_response_message, extract_certifications,
+    certification_key
 )
 
 # Ensure the parent directory is in sys.path for reliable imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 logger = logging.getLogger("main")
-logging.basicConfig(level=logging.INFO)
 
+MAX_CIRCUIT_PROBES = 30
+DEFAULT_CERTIFICATION_CONCURRENCY = 5
 
+DEFAULT_OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Instructor records")
+TRACE_FILE_NAME = "trace.json"
+DEFAULT_TUNED_PROFILE_PATH = os.path.join(DEFAULT_OUTPUT_DIR, "tuned_profile.json")
+
+
+@traced("get_ts_id", "api")
 def get_ts_id(api_client, training_site_text) -> Optional[str]:
     if training_site_text == "TS68082 Code Blue CPR Services, LLC (AHA ACCOUNT)":
         return "3"
@@ -32,8 +60,8 @@ def get_ts_id(api_client, training_site_text) -> Optional[str]:
     return get_best_match_id(ts_data, training_site_text)
 
 
-def build_instructor_payload(driver, api_client) -> dict:
-    """Template payload builder for the instructors/store endpoint."""
+def build_instructor_record(driver, api_client, url: str = "") -> InstructorRecord:
+    """Read the open user-edit page into an InstructorRecord (see InstructorRecord.to_payload)."""
     address1 = get_element_value(driver, "address1")
     city = get_element_value(driver, "city")
     state = get_element_value(driver, "stateprovince")
@@ -46,32 +74,7 @@ def build_instructor_payload(driver, api_client) -> dict:
     isInstructor = "3" if get_checkbox_value(driver, "instructorCk") == "1" else "0"
     isInstructorAssistant = "4" if get_checkbox_value(driver, "assistantCk") == "1" else "0"
 
-    # 1. Build the base payload
-    payload = {
-        # Core identity fields
-        "username": get_element_value(driver, "username"),
-        "training_site_id": get_ts_id(api_client, training_site_text),
-        "first_name": get_element_value(driver, "fname"),
-        "last_name": get_element_value(driver, "lname"),
-        "address_line_1": "123 Main St" if not address1 else address1,
-        "address_line_2": get_element_value(driver, "address2"),
-        "city": "Anytown" if not city else city,
-        "state_province_region": "State" if not state else state,
-        "country_id": "184",
-        "mobile_phone": "999-999-9999" if not phone else phone,
-        "email": get_element_value(driver, "Email"),
-        "zip_postal_code": "00000" if not zip_code else zip_code,
-        "name_to_print_on_card": get_element_value(driver, "nameOnCard"),
-        "aha_instructor_id": get_element_value(driver, "ahaInstructorId"),
-        "hsi_instructor_id": get_element_value(driver, "ashiInstructorId"),
-        "rclc_username": get_element_value(driver, "redCrossId"),
-        "password": "12345678",
-        "active_user": get_checkbox_value(driver, "ActiveUser"),
-        "read_only_user": get_checkbox_value(driver, "isReadOnly"),
-        "allow_bid_on_open_classes": "0",
-    }
-
-    # 2. Conditionally build the roles list
+    # 1. Conditionally build the roles list
     roles = []
     if isAdmin != "0":
         roles.append(2)
@@ -80,19 +83,41 @@ def build_instructor_payload(driver, api_client) -> dict:
     if isInstructorAssistant != "0":
         roles.append(4)
 
-    # 3. Add the roles key to the dictionary only if the list isn't empty
-    if roles:
-        payload["roles[]"] = roles
-
-    return payload
-
-
-def create_instructor(api_client: APIClient, payload: dict) -> str:
+    # 2. Build the record
+    return InstructorRecord(
+        url=url,
+        # Core identity fields
+        username=get_element_value(driver, "username"),
+        training_site_id=get_ts_id(api_client, training_site_text),
+        first_name=get_element_value(driver, "fname"),
+        last_name=get_element_value(driver, "lname"),
+        address_line_1="123 Main St" if not address1 else address1,
+        address_line_2=get_element_value(driver, "address2"),
+        city="Anytown" if not city else city,
+        state_province_region="State" if not state else state,
+        country_id="184",
+        mobile_phone="999-999-9999" if not phone else phone,
+        email=get_element_value(driver, "Email"),
+        zip_postal_code="00000" if not zip_code else zip_code,
+        name_to_print_on_card=get_element_value(driver, "nameOnCard"),
+        aha_instructor_id=get_element_value(driver, "ahaInstructorId"),
+        hsi_instructor_id=get_element_value(driver, "ashiInstructorId"),
+        rclc_username=get_element_value(driver, "redCrossId"),
+        password="12345678",
+        active_user=get_checkbox_value(driver, "ActiveUser"),
+        read_only_user=get_checkbox_value(driver, "isReadOnly"),
+        allow_bid_on_open_classes="0",
+        roles=tuple(roles),
+    )
+
+
+@traced("create_instructor", "api")
+def create_instructor(api_client: APIClient, record: InstructorRecord) -> str:
     """Create instructor without files; returns: created, exists, or failed."""
-    username = payload.get("username", "")
+    username = record.username
     duplicate_msg = "The username has already been taken."
     try:
-        response = api_client.post(APIEndpoints.INSTRUCTOR_CREATE, payload=payload)
+        response = api_client.post(APIEndpoints.INSTRUCTOR_CREATE, payload=record.to_payload())
         message = extract_response_message(response)
         if duplicate_msg in message:
             logger.info(f"Skipping existing instructor {username}: {duplicate_msg}")
@@ -108,33 +133,39 @@ def create_instructor(api_client: APIClient, payload: dict) -> str:
         return "failed"
 
 
-def find_instructor_by_email(api_client: APIClient, email: str) -> Optional[dict]:
+@traced("find_instructor_by_email", "api")
+def find_instructor_by_email(api_client: APIClient, email_key: str) -> Optional[RemoteInstructor]:
+    """Look up an instructor by normalized email (``InstructorRecord.email_key``)."""
     time.sleep(0.5)
-    target = (email or "").strip().lower()
     try:
         response = api_client.get(APIEndpoints.INSTRUCTOR_LIST, params='per_page=1000')
+        # The list is fetched fresh for every instructor (it was just created), so only the
+        # matching entry is turned into a RemoteInstructor.
         for entry in extract_instructors_list(response):
-            if not isinstance(entry, dict):
-                continue
-            entry_username = str(entry.get("email", "")).strip().lower()
-            if entry_username == target:
-                return entry
-        logger.info(f"Instructor {email} not found in instructors list")
+            if isinstance(entry, dict) and normalize_email(entry.get("email")) == email_key:
+                return RemoteInstructor.from_entry(entry)
+        logger.info(f"Instructor {email_key} not found in instructors list")
         return None
     except Exception as exc:
         logger.error(f"Error fetching instructors list: {exc}")
         return None
 
 
+@traced("upload_document", "api")
 def upload_document(api_client: APIClient, instructor_id: str, file_path: str) -> bool:
     if not os.path.exists(file_path):
         logger.warning(f"File missing before upload, skipping: {file_path}")
         return False
-    mime_type = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+    file_name = os.path.basename(file_path)
     try:
-        with open(file_path, "rb") as fh:
-            files = [("document_path", (os.path.basename(file_path), fh, mime_type))]
-            api_client.post(APIEndpoints.INSTUCTOR_DOCUMENT_CREATE, payload={"instructor_id": instructor_id}, files=files)
+        # Stream the multipart body from disk so large scans are never buffered in memory.
+        files = [("document_path", (file_name, file_path))]
+        api_client.post_multipart(
+            APIEndpoints.INSTUCTOR_DOCUMENT_CREATE,
+            payload={"instructor_id": instructor_id},
+            files=files,
+            progress_callback=log_upload_progress(file_name),
+        )
         logger.info(f"Uploaded document for instructor {instructor_id}: {file_path}")
         return True
     except Exception as exc:
@@ -154,15 +185,79 @@ def upload_document(api_client: APIClient, instructor_id: str, file_path: str) -
                 logger.warning(f"Could not delete local file {file_path}: {delete_exc}")
 
 
+def get_certification_concurrency() -> int:
+    raw = str(os.getenv("CERTIFICATION_CONCURRENCY") or "").strip()
+    return int(raw) if raw.isdigit() and int(raw) > 0 else DEFAULT_CERTIFICATION_CONCURRENCY
+
+
+def sync_certifications(api_client: APIClient, remote: RemoteInstructor, certifications: list,
+                        concurrency: int = DEFAULT_CERTIFICATION_CONCURRENCY) -> list:
+    """Post certifications missing remotely, concurrently; return names of the ones that failed."""
+    instructor_id = remote.id
+    existing = set(remote.certification_keys)
+    pending = []
+    for certification in certifications:
+        key = certification_key(certification)
+        if key in existing:
+            logger.info(f"Skipping existing certification for instructor {instructor_id}: {certification['certification_name']}")
+            continue
+        existing.add(key)
+        pending.append(certification)
+    if not pending:
+        return []
+
+    calls = [
+        ("POST", APIEndpoints.INSTUCTOR_CERTIFICATE_CREATE, {"payload": {"instructor_id": instructor_id, **certification}})
+        for certification in pending
+    ]
+    with tracer.span("sync_certifications", "api", count=len(calls)):
+        results = run_api_calls(
+            calls, concurrency, base_url=api_client.base_url, headers=api_client.async_headers(),
+            breaker=api_client.breaker, rate_limiter=api_client.rate_limiter,
+        )
+    failed = []
+    for certification, result in zip(pending, results):
+        if isinstance(result, Exception):
+            logger.error(f"Failed to create certification {certification['certification_name']} for instructor {instructor_id}: {result}")
+            failed.append(certification["certification_name"])
+        else:
+            logger.info(f"Created certification {certification['certification_name']} for instructor {instructor_id}")
+    return failed
+
+
 class CreateInstructorsBackup:
     def __init__(self):
-        self.driver = None
+        self.driver_manager = None
+        self.api_client = None
+        self.downloads_dir = ""
+        self.csv_log_path = ""
+        self.done_urls_path = ""
+        self.done_urls = None
+        self.max_upload_bytes = None
+        self.download_session = None
+        self.download_workers = 1
+        self.certification_concurrency = DEFAULT_CERTIFICATION_CONCURRENCY
+        self.optimize_pool = None
+        self.optimize_target_bytes = None
+        self.total_bytes_saved = 0
+        self.dead_letters = None
+        self.last_stats = {}
+        self.visit_started = None
+        self.status_counts = Counter()
+        self.api_unavailable = False
+
+    @property
+    def driver(self):
+        return self.driver_manager.driver if self.driver_manager else None
 
     def initialize(self) -> bool:
         try:
             headless = True
-            self.driver = get_undetected_driver(headless=headless)
-            if self.driver:
+            # Re-logins (cookie restore after a recycle, expired download session) only need the
+            # session back, not the full "All" instructor table.
+            relogin = functools.partial(login_to_enrollware_and_navigate_to_instructor_records, show_all=False)
+            self.driver_manager = DriverManager(headless=headless, relogin=relogin)
+            if self.driver_manager.start():
                 logger.info(f"Chrome driver initialized successfully, mode: {'headless' if headless else 'headed'}")
                 return True
             else:
@@ -172,15 +267,273 @@ class CreateInstructorsBackup:
             logger.error(f"Initialization failed: {e}")
             return False
 
+    def load_done_urls(self) -> set:
+        """Read done_urls.txt once; later checks use the in-memory set kept in sync by mark_done."""
+        if self.done_urls is None:
+            self.done_urls = set()
+            if os.path.exists(self.done_urls_path):
+                with open(self.done_urls_path, "r", encoding="utf-8") as f:
+                    self.done_urls = set(line.strip() for line in f if line.strip())
+        return self.done_urls
+
+    def is_done(self, url: str) -> bool:
+        return url in self.load_done_urls()
+
+    def forget_done(self, urls: set) -> None:
+        """Drop URLs from done_urls.txt so they are processed again."""
+        self.load_done_urls().difference_update(urls)
+        with open(self.done_urls_path, "w", encoding="utf-8") as f:
+            f.writelines(url + "\n" for url in self.done_urls)
+
+    def mark_done(self, url: str) -> None:
+        self.load_done_urls().add(url)
+        with open(self.done_urls_path, "a", encoding="utf-8") as f:
+            f.write(url + "\n")
+
+    def wait_for_api(self) -> bool:
+        """Pause while the API circuit is open; probe until it closes. Returns False if it stays down.
+
+        After one full probe cycle fails the API is treated as down for the rest of the run,
+        so later callers return immediately instead of probing again.
+        """
+        breaker = self.api_client.breaker
+        if self.api_unavailable:
+            return False
+        for _ in range(MAX_CIRCUIT_PROBES):
+            if breaker.is_closed:
+                return True
+            breaker.wait_until_probe()
+            try:
+                self.api_client.get(APIEndpoints.INSTRUCTOR_LIST, params="per_page=1")
+            except CircuitOpenError:
+                continue
+            except Exception as e:
+                logger.warning(f"API probe failed: {e}")
+        if breaker.is_closed:
+            return True
+        logger.error(f"API still unavailable after {MAX_CIRCUIT_PROBES} probes; giving up for this run")
+        self.api_unavailable = True
+        return False
+
+    def defer_if_circuit_open(self, url: str, stage: str, reason: str, username: str = "", email: str = "") -> bool:
+        """Send work that failed during an API outage to the dead-letter queue instead of the CSV."""
+        if self.dead_letters is None or self.api_client.breaker.is_closed:
+            return False
+        self.dead_letters.push(url, stage, reason, username, email)
+        return True
+
+    def drain_dead_letters(self) -> None:
+        """Re-run deferred instructors once the circuit has recovered."""
+        if self.dead_letters is None or not self.api_client.breaker.is_closed:
+            return
+        entries = self.dead_letters.pop_all()
+        if not entries:
+            return
+        logger.info(f"API recovered, draining {len(entries)} dead-letter entry(ies)")
+        for entry in entries:
+            url = entry.get("url", "")
+            if url:
+                with log_context(correlation_key(url)), \
+                        tracer.span("instructor", "instructor", url=url, dead_letter=True) as span_args:
+                    span_args["status"] = self.process_instructor(url)
+                self.status_counts[span_args["status"]] += 1
+
+    def process_instructor(self, url: str) -> str:
+        """Sync one Enrollware instructor page; returns: skipped, logged, deferred, or done."""
+        self.last_stats = {}
+        self.visit_started = None
+        # Check if the instructor's URL has already been processed to avoid duplicates
+        if self.is_done(url):
+            logger.info(f"Skipping already processed URL: {url}")
+            return "skipped"
+        # Don't pay for the page scrape and downloads while the API is known to be down.
+        if not self.wait_for_api():
+            self.defer_if_circuit_open(url, "scrape", "API unavailable")
+            return "deferred"
+        self.visit_started = time.monotonic()
+        with tracer.span("page_load", "webdriver", url=url):
+            self.driver_manager.navigate(url)
+        try:
+            with tracer.span("build_instructor_record"):
+                record = build_instructor_record(self.driver, self.api_client, url)
+        except RuntimeError as e:
+            if self.defer_if_circuit_open(url, "scrape", str(e)):
+                return "deferred"
+            # A single slow or failing training-site lookup must not end the run; the URL is not
+            # marked done, so the next run picks it up again.
+            logger.warning(f"Training site lookup failed for {url}: {e}")
+            append_to_csv(self.csv_log_path, {
+                "email": get_element_value(self.driver, "Email"),
+                "username": get_element_value(self.driver, "username"),
+                "reason": "training_site_lookup_failed",
+            })
+            return "logged"
+        email_hint = record.email
+        username = record.username
+        self.last_stats.update(email=email_hint, active=record.active_user)
+        with tracer.span("extract_certifications"):
+            certifications = extract_certifications(self.driver)
+
+        # Validate instructor data before attempting API creation
+        missing_fields = record.missing_fields()
+        if missing_fields:
+            missing_reason = f"missing fields: {', '.join(missing_fields)}"
+            logger.warning(f"Incomplete data for instructor {username}, skipping API create ({missing_reason})")
+            append_to_csv(self.csv_log_path, record.log_row(missing_reason))
+            return "logged"
+
+        # Create instructor / Pass if already exist
+        create_status = create_instructor(self.api_client, record)
+        if create_status == "failed":
+            if self.defer_if_circuit_open(url, "create", "creation_failed", username, email_hint):
+                return "deferred"
+            append_to_csv(self.csv_log_path, record.log_row("creation_failed"))
+            return "logged"
+
+        # Find instructor using email for making another API call for uploading documents
+        remote = find_instructor_by_email(self.api_client, record.email_key)
+        if not remote:
+            if self.defer_if_circuit_open(url, "lookup", "not_found_in_list", username, email_hint):
+                return "deferred"
+            append_to_csv(self.csv_log_path, record.log_row("not_found_in_list"))
+            return "logged"
+
+        # Extract instructor Enroll Nationwide ID for uploading documents; if not found, log and skip uploads
+        instructor_id = remote.id
+        if not instructor_id:
+            append_to_csv(self.csv_log_path, record.log_row("no_instructor_id"))
+            return "logged"
+
+        # Certifications are read from the page already open, so they cost no extra crawl.
+        if certifications:
+            failed_certifications = sync_certifications(
+                self.api_client, remote, certifications, self.certification_concurrency
+            )
+            if failed_certifications:
+                if self.defer_if_circuit_open(url, "certifications", "failed_certifications", username, email_hint):
+                    return "deferred"
+                append_to_csv(self.csv_log_path, record.log_row("failed_certifications", "; ".join(failed_certifications)))
+
+        all_files = self.driver.find_elements(By.XPATH, "//a[@title= 'View']")
+        if not all_files:
+            logger.info(f"No files found for instructor: {username}")
+            append_to_csv(self.csv_log_path, record.log_row("no_files_found"))
+            return "logged"
+
+        # Keep only files that are not already present remotely by filename match.
+        file_paths = []
+        for file_link in all_files:
+            file_url = str(file_link.get_attribute("href") or "").strip()
+            file_name = str(file_link.text or "").strip() or os.path.basename(file_url.split("?")[0]) or "unknown_file"
+            if remote.has_document(file_name):
+                logger.info(f"Skipping already uploaded file for {username}: {file_name}")
+                continue
+            local_path = os.path.join(self.downloads_dir, file_name)
+            file_paths.append({"path": local_path, "name": file_name, "url": file_url})
+
+        if not file_paths:
+            logger.info(f"All files already exist remotely for instructor: {username}")
+            append_to_csv(self.csv_log_path, record.log_row("all_files_already_present"))
+            return "logged"
+
+        # Probe sizes before downloading; oversize files can never be uploaded, so divert them now
+        # unless the optimization stage may still shrink them under the limit.
+        can_shrink = (lambda item: is_optimizable(item["name"])) if self.optimize_pool is not None else None
+        with tracer.span("preflight", files=len(file_paths)):
+            file_paths, oversize_files = preflight_files(
+                self.download_session, file_paths, self.max_upload_bytes, can_shrink
+            )
+        self.last_stats.update(
+            missing_docs=len(file_paths), missing_bytes=sum(item.get("size") or 0 for item in file_paths)
+        )
+        if oversize_files:
+            oversize_names = "; ".join(item["name"] for item in oversize_files)
+            append_to_csv(self.csv_log_path, record.log_row("file_too_large", oversize_names))
+        if not file_paths:
+            return "logged"
+
+        # Download missing files only; keep any existing local copy for upload.
+        download_failures = download_files(self.download_session, file_paths, username, self.download_workers)
+
+        upload_candidates = [item for item in file_paths if os.path.exists(item["path"])]
+        if not upload_candidates:
+            append_to_csv(self.csv_log_path, record.log_row("no_files_to_upload", "; ".join(download_failures)))
+            return "logged"
+
+        # Optional transform stage: shrink images/PDFs in place (file names are preserved).
+        if self.optimize_pool is not None:
+            with tracer.span("optimize_documents", files=len(upload_candidates)):
+                saved = optimize_documents(
+                    self.optimize_pool, [item["path"] for item in upload_candidates], self.optimize_target_bytes
+                )
+            self.total_bytes_saved += sum(saved.values())
+            if self.max_upload_bytes is not None:
+                still_oversize = [
+                    item for item in upload_candidates if os.path.getsize(item["path"]) > self.max_upload_bytes
+                ]
+                for item in still_oversize:
+                    logger.warning(f"Skipping {item['name']}: still above the upload limit after optimization")
+                    os.remove(item["path"])
+                if still_oversize:
+                    append_to_csv(self.csv_log_path, record.log_row(
+                        "file_too_large", "; ".join(item["name"] for item in still_oversize)
+                    ))
+                    upload_candidates = [item for item in upload_candidates if item not in still_oversize]
+
+        # Upload documents; if any upload fails, log failed file names only.
+        failed_uploads = []
+        for item in upload_candidates:
+            if not upload_document(self.api_client, instructor_id, item["path"]):
+                failed_uploads.append(item["name"])
+                continue
+
+        if failed_uploads and self.defer_if_circuit_open(url, "upload", "failed_uploads", username, email_hint):
+            # Files already uploaded are skipped by the remote filename match on retry.
+            return "deferred"
+        if failed_uploads:
+            append_to_csv(self.csv_log_path, record.log_row("failed_uploads", "; ".join(failed_uploads)))
+
+        # add url to done_urls.txt for avoiding re-processing
+        self.mark_done(url)
+        return "done"
+
     def cleanup(self):
+        if self.download_session is not None:
+            self.download_session.close()
         if self.driver:
             try:
-                self.driver.quit()
+                self.driver_manager.report()
+                self.driver_manager.quit()
                 logger.info("Resources cleaned up successfully")
             except Exception as e:
                 logger.error(f"Error during cleanup: {e}")
 
 
+def download_files(session: DownloadSession, file_paths: list, username: str, workers: int = 1) -> list:
+    """Download each file to its local path over the shared session; return names of files that failed."""
+    def download(file_info: dict) -> Optional[str]:
+        if os.path.exists(file_info["path"]):
+            logger.info(f"File already exists locally, skipping download: {file_info['name']}")
+            return None
+        try:
+            with tracer.span("download", "transfer", file=file_info["name"], size=file_info.get("size")):
+                session.download(file_info["url"], file_info["path"])
+            logger.info(f"Downloaded: {file_info['name']}")
+            return None
+        except Exception as e:
+            logger.error(f"Failed to download {file_info['url']} for instructor {username}: {e}")
+            return file_info["name"]
+
+    if workers <= 1 or len(file_paths) <= 1:
+        results = [download(file_info) for file_info in file_paths]
+    else:
+        # Each transfer runs in a copy of this context so its logs keep the instructor's correlation ID.
+        with ThreadPoolExecutor(max_workers=min(workers, len(file_paths))) as executor:
+            futures = [executor.submit(contextvars.copy_context().run, download, file_info) for file_info in file_paths]
+            results = [future.result() for future in futures]
+    return [name for name in results if name]
+
+
 def append_to_csv(csv_path: str, row: dict) -> None:
     """Append a row to the CSV log, creating headers if the file is new."""
     headers = ["name", "email", "username", "files", "reason"]
@@ -198,163 +551,219 @@ def append_to_csv(csv_path: str, row: dict) -> None:
         })
 
 
-def generate_record(email, username, reason, _files = "") -> dict:
-    record = {
-        "email": email,
-        "username": username,
-        "files": _files,
-        "reason": reason,
+def correlation_key(url: str) -> str:
+    """Short per-instructor ID for log correlation (the user-edit query string, e.g. ``id=123``)."""
+    parts = urlsplit(url)
+    return parts.query or parts.path.rsplit("/", 1)[-1] or url
+
+
+def fetch_remote_emails(api_client: APIClient) -> set:
+    """Emails of instructors that already exist in Enroll Nationwide (one list call)."""
+    try:
+        response = api_client.get(APIEndpoints.INSTRUCTOR_LIST, params='per_page=1000')
+    except Exception as exc:
+        logger.warning(f"Could not fetch instructors list for scheduling: {exc}")
+        return set()
+    return set(index_remote_instructors(extract_instructors_list(response)))
+
+
+def write_run_summary(path: str, processor: CreateInstructorsBackup, started_at: float, completed: bool) -> None:
+    """Per-run throughput summary (read by orchestrator.py for the aggregated report)."""
+    elapsed = time.time() - started_at
+    synced = processor.status_counts["done"] + processor.status_counts["logged"]
+    summary = {
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(started_at)),
+        "elapsed_seconds": round(elapsed, 1),
+        "completed": completed,
+        "statuses": dict(processor.status_counts),
+        "records_per_minute": round(synced * 60 / elapsed, 2) if elapsed > 0 else 0.0,
+        "dead_letters_remaining": len(processor.dead_letters) if processor.dead_letters is not None else 0,
+        "bytes_saved": processor.total_bytes_saved,
+        "driver_recycles": len(processor.driver_manager.recycle_events) if processor.driver_manager else 0,
     }
-    return record
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
 
 
-def main():
-    all_instructors_urls = []
+def main(trace_path: Optional[str] = None, profile: bool = False, schedule: str = "sjf",
+         max_duration: Optional[float] = None, tuned_profile: Optional[str] = DEFAULT_TUNED_PROFILE_PATH,
+         output_dir: str = DEFAULT_OUTPUT_DIR):
     url = "https://www.enrollware.com/admin/tc-user-list.aspx"
+    started_at = time.time()
+    completed = False
+    scheduler = None
+    if tuned_profile:
+        apply_tuned_profile(tuned_profile)
     processor = CreateInstructorsBackup()
-    api_client = APIClient()
+    processor.api_client = APIClient(rate_limiter=create_rate_limiter())
     try:
         if not processor.initialize():
             return
-        if not login_to_enrollware_and_navigate_to_instructor_records(processor.driver):
+        # The list is read through the DataTables API, so rendering "All" rows is only a fallback.
+        if not login_to_enrollware_and_navigate_to_instructor_records(processor.driver, show_all=False):
             return
+        processor.driver_manager.snapshot_cookies()
 
-        downloads_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Instructor records")
+        downloads_dir = output_dir
         if not os.path.exists(downloads_dir):
             os.makedirs(downloads_dir, exist_ok=True)
-        csv_log_path = os.path.join(downloads_dir, "instructors_skipped.csv")
-
-        instructor_urls = processor.driver.find_elements(By.XPATH, "//td/a[contains(@href, 'user-edit')]")
-        for instructor_url in instructor_urls:
-            _url = instructor_url.get_attribute("href")
-            all_instructors_urls.append(_url)
-
-        for url in all_instructors_urls:
-            # Check if the instructor's URL has already been processed to avoid duplicates
-            done_urls_path = os.path.join(downloads_dir, "done_urls.txt")
-            if os.path.exists(done_urls_path):
-                with open(done_urls_path, "r", encoding="utf-8") as f:
-                    done_urls = set(line.strip() for line in f)
-                if url in done_urls:
-                    logger.info(f"Skipping already processed URL: {url}")
-                    continue
-            processor.driver.get(url)
-            payload = build_instructor_payload(processor.driver, api_client)
-            full_name = payload.get("first_name", "") + " " + payload.get("last_name", "")
-            email_hint = payload.get("email", "")
-            username = payload.get('username', '')
-
-            # Validate instructor data before attempting API creation
-            missing_fields = instructor_is_valid(payload)
-            if missing_fields:
-                missing_reason = f"missing fields: {', '.join(missing_fields)}"
-                logger.warning(f"Incomplete data for instructor {username}, skipping API create ({missing_reason})")
-                record = generate_record(email_hint, username, missing_reason)
-                append_to_csv(csv_log_path, record)
-                continue
-
-            # Create instructor / Pass if already exist
-            create_status = create_instructor(api_client, payload)
-            if create_status != "created":
-                if create_status == "exists":
-                    pass
-                else:
-                    record = generate_record(email_hint, username, "creation_failed")
-                    append_to_csv(csv_log_path, record)
-                    continue
-
-            # Find instructor using email for making another API call for uploading documents
-            instructor_entry = find_instructor_by_email(api_client, payload.get("email", ""))
-            if not instructor_entry:
-                record = generate_record(email_hint, username, "not_found_in_list")
-                append_to_csv(csv_log_path, record)
-                continue
-
-            # Extract instructor Enroll Nationwide ID for uploading documents; if not found, log and skip uploads
-            instructor_id = str(instructor_entry.get("id") or "").strip()
-            if not instructor_id:
-                record = generate_record(email_hint, username, "no_instructor_id")
-                append_to_csv(csv_log_path, record)
-                continue
-
-            all_files = processor.driver.find_elements(By.XPATH, "//a[@title= 'View']")
-            if not all_files:
-                logger.info(f"No files found for instructor: {username}")
-                record = generate_record(email_hint, username, "no_files_found")
-                append_to_csv(csv_log_path, record)
-                continue
-
-            documents = instructor_entry.get("documents")
-            remote_document_names = extract_document_filenames(documents)
-
-            # Keep only files that are not already present remotely by filename match.
-            file_paths = []
-            for file_link in all_files:
-                file_url = str(file_link.get_attribute("href") or "").strip()
-                file_name = str(file_link.text or "").strip() or os.path.basename(file_url.split("?")[0]) or "unknown_file"
-                normalized_name = file_name.lower()
-                if normalized_name in remote_document_names:
-                    logger.info(f"Skipping already uploaded file for {username}: {file_name}")
-                    continue
-                local_path = os.path.join(downloads_dir, file_name)
-                file_paths.append({"path": local_path, "name": file_name, "url": file_url})
-
-            if not file_paths:
-                logger.info(f"All files already exist remotely for instructor: {username}")
-                record = generate_record(email_hint, username, "all_files_already_present")
-                append_to_csv(csv_log_path, record)
-                continue
-
-            # Download missing files only; keep any existing local copy for upload.
-            download_failures = []
-            for file_info in file_paths:
-                if os.path.exists(file_info["path"]):
-                    logger.info(f"File already exists locally, skipping download: {file_info['name']}")
-                    continue
-                try:
-                    response = requests.get(file_info["url"], stream=True, timeout=60)
-                    if response.status_code == 200:
-                        with open(file_info["path"], "wb") as f:
-                            shutil.copyfileobj(response.raw, f)
-                        logger.info(f"Downloaded: {file_info['name']}")
-                    else:
-                        logger.error(f"Failed to download {file_info['url']} for instructor {username}")
-                        download_failures.append(file_info["name"])
-                except Exception as e:
-                    logger.error(f"Exception downloading {file_info['url']} for instructor {username}: {e}")
-                    download_failures.append(file_info["name"])
-
-            upload_candidates = [item for item in file_paths if os.path.exists(item["path"])]
-            if not upload_candidates:
-                record = generate_record(email_hint, username, "no_files_to_upload", _files="; ".join(download_failures))
-                append_to_csv(csv_log_path, record)
-                continue
-
-            # Upload documents; if any upload fails, log failed file names only.
-            failed_uploads = []
-            for item in upload_candidates:
-                if not upload_document(api_client, instructor_id, item["path"]):
-                    failed_uploads.append(item["name"])
-                    continue
-
-            if failed_uploads:
-                record = generate_record(email_hint, username, "failed_uploads", _files="; ".join(failed_uploads))
-                append_to_csv(csv_log_path, record)
-
-            # add url to done_urls.txt for avoiding re-processing
-            with open(done_urls_path, "a", encoding="utf-8") as f:
-                f.write(url + "\n")
-
+        processor.downloads_dir = downloads_dir
+        processor.csv_log_path = os.path.join(downloads_dir, "instructors_skipped.csv")
+        processor.done_urls_path = os.path.join(downloads_dir, "done_urls.txt")
+        processor.max_upload_bytes = get_max_upload_bytes()
+        processor.download_workers = get_download_workers()
+        processor.certification_concurrency = get_certification_concurrency()
+        processor.download_session = DownloadSession(processor.driver_manager, pool_size=processor.download_workers)
+        processor.optimize_pool = create_optimize_pool()
+        processor.optimize_target_bytes = get_optimize_target_bytes()
+        processor.dead_letters = DeadLetterQueue(os.path.join(downloads_dir, "dead_letter.jsonl"))
+        if trace_path:
+            tracer.enable(trace_path)
+
+        rows = enumerate_instructor_rows(processor.driver)
+        if rows is None:
+            show_all_instructor_rows(processor.driver)
+            rows = enumerate_instructor_rows_from_dom(processor.driver)
+        rows = list({row["url"]: row for row in rows if row.get("url")}.values())
+        all_instructors_urls = [row["url"] for row in rows]
+
+        # Compare with the previous enumeration: changed rows are re-synced even if done before.
+        instructor_index = InstructorIndex(os.path.join(downloads_dir, "instructor_index.json"))
+        _, changed_urls, _ = instructor_index.diff(rows)
+
+        # Plan the run: drop finished URLs, then order the rest by estimated cost/value.
+        scheduler = InstructorScheduler(
+            os.path.join(downloads_dir, "schedule_cache.json"), schedule,
+            max_duration * 60 if max_duration else None,
+        )
+        if changed_urls:
+            processor.forget_done(changed_urls)
+        done_urls = processor.load_done_urls()
+        instructor_index.update(rows)
+        instructor_index.save()
+        pending_urls = [_url for _url in all_instructors_urls if _url not in done_urls]
+        logger.info(f"Skipping {len(all_instructors_urls) - len(pending_urls)} already processed URL(s)")
+        for row in rows:
+            if row.get("email"):
+                scheduler.record(row["url"], email=row["email"])
+        if schedule in ("new-first", "value"):
+            scheduler.set_remote_emails(fetch_remote_emails(processor.api_client))
+        pending_urls = scheduler.order(pending_urls)
+
+        profiler = profile_block(os.path.join(downloads_dir, "profile.pstats")) if profile else nullcontext()
+        with profiler:
+            processor.drain_dead_letters()
+            over_budget = 0
+            for index, url in enumerate(pending_urls):
+                if not scheduler.has_time_for(url):
+                    if schedule != "sjf":
+                        # Not sorted by cost: a cheaper instructor further down may still fit.
+                        over_budget += 1
+                        continue
+                    logger.info(
+                        f"Time budget reached after {scheduler.elapsed() / 60:.1f} min; stopping with "
+                        f"{len(pending_urls) - index} instructor(s) left for the next run"
+                    )
+                    break
+                if processor.api_unavailable:
+                    logger.warning(f"Stopping with {len(pending_urls) - index} instructor(s) left for the next run: API is down")
+                    break
+                with log_context(correlation_key(url)), tracer.span("instructor", "instructor", url=url) as span_args:
+                    try:
+                        span_args["status"] = processor.process_instructor(url)
+                    except DRIVER_ERRORS as e:
+                        # A browser that died mid-page is replaced and the instructor retried once.
+                        reason = f"driver crash: {getattr(e, 'msg', None) or e}"
+                        if not is_dead_driver_error(e) or not processor.driver_manager.recycle(reason, crashed=True):
+                            raise
+                        span_args["status"] = processor.process_instructor(url)
+                processor.status_counts[span_args["status"]] += 1
+                # Only real page visits teach the cost model; skips and deferrals (which may have
+                # waited out an API outage) say nothing about how long the instructor takes.
+                seconds = None
+                if span_args["status"] in ("done", "logged") and processor.visit_started is not None:
+                    seconds = time.monotonic() - processor.visit_started
+                scheduler.record(url, seconds, **processor.last_stats)
+                scheduler.save_if_due()
+                processor.drain_dead_letters()
+            if over_budget:
+                logger.info(f"Time budget: {over_budget} instructor(s) did not fit and are left for the next run")
+            if len(processor.dead_letters) and processor.wait_for_api():
+                processor.drain_dead_letters()
+            if len(processor.dead_letters):
+                logger.warning(f"{len(processor.dead_letters)} instructor(s) remain in the dead-letter queue for the next run")
+
+        if processor.optimize_pool is not None:
+            logger.info(f"Document optimization saved {processor.total_bytes_saved} bytes in total")
         processor.cleanup()
+        completed = True
         print("\nAll files processed and sent to enrollnationwide API.\n")
 
 
     except Exception as e:
         logger.error(f"Unexpected error in main: {e}")
     finally:
+        if scheduler is not None:
+            scheduler.save()
         if 'processor' in locals():
             processor.cleanup()
+        if processor.optimize_pool is not None:
+            processor.optimize_pool.shutdown()
+        tracer.export()
+        if os.path.isdir(output_dir):
+            write_run_summary(os.path.join(output_dir, "run_summary.json"), processor, started_at, completed)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Sync Enrollware instructors to Enroll Nationwide.")
+    parser.add_argument(
+        "--trace", nargs="?", const="", default=None, metavar="PATH",
+        help="record per-instructor/operation spans as Chrome-trace JSON (default: <output dir>/trace.json)",
+    )
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="run the main loop under cProfile and log per-function hotspots",
+    )
+    parser.add_argument(
+        "--log-json", default=None, metavar="PATH",
+        help="also write logs as JSON lines (with instructor correlation_id) to PATH",
+    )
+    parser.add_argument(
+        "--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help="minimum log level (default: INFO)",
+    )
+    parser.add_argument(
+        "--schedule", choices=SCHEDULE_MODES, default="sjf",
+        help="processing order: dom (page order), sjf (shortest job first), new-first, value (value per cost)",
+    )
+    parser.add_argument(
+        "--max-duration", type=float, default=None, metavar="MINUTES",
+        help="stop cleanly before starting an instructor that would exceed this time budget",
+    )
+    parser.add_argument(
+        "--tuned-profile", default=DEFAULT_TUNED_PROFILE_PATH, metavar="PATH",
+        help="settings written by autotune.py (default: Instructor records/tuned_profile.json; "
+             "environment variables override it)",
+    )
+    parser.add_argument(
+        "--output-dir", default=DEFAULT_OUTPUT_DIR, metavar="DIR",
+        help="downloads, checkpoints and reports directory (default: Instructor records)",
+    )
+    args = parser.parse_args(argv)
+    if args.trace == "":
+        args.trace = os.path.join(args.output_dir, TRACE_FILE_NAME)
+    return args
+
+
+def _exit_on_sigterm(signum, frame):
+    # The orchestrator stops tenants with SIGTERM; exiting through SystemExit runs main()'s
+    # finally block so Chrome is quit and its profile clone released instead of orphaned.
+    raise SystemExit(128 + signum)
 
 
 if __name__ == "__main__":
-    main()
+    signal.signal(signal.SIGTERM, _exit_on_sigterm)
+    args = parse_args()
+    configure_logging(getattr(logging, args.log_level), json_path=args.log_json)
+    main(trace_path=args.trace, profile=args.profile, schedule=args.schedule, max_duration=args.max_duration,
+         tuned_profile=args.tuned_profile, output_dir=args.output_dir)
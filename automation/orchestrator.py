@@ -0,0 +1,242 @@
+"""Run main.py for several Enrollware tenants in parallel under global browser and API caps.
+
+Usage (from project root):
+
+    python automation/orchestrator.py tenants.json
+
+Each tenant runs as its own main.py process with its own credentials, Chrome profile,
+output directory (checkpoints, CSV, caches) and API rate limit. At most ``max_browsers``
+tenants run at once, and API concurrency and rate are split between the running slots so
+their sum never exceeds the global caps. An aggregated throughput report is written to
+``<output_root>/orchestrator_report.json``.
+"""
+import os
+import re
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+import subprocess
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from Utils.logging_setup import configure_logging  # noqa: E402
+from Utils.tuning import load_tuned_profile  # noqa: E402
+
+logger = logging.getLogger("orchestrator")
+
+MAIN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+RECORDS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Instructor records")
+DEFAULT_OUTPUT_ROOT = os.path.join(RECORDS_DIR, "tenants")
+DEFAULT_MAX_BROWSERS = 2
+DEFAULT_MAX_API_CONCURRENCY = 10
+# Seconds a stopped tenant gets to quit Chrome and write its summary before it is killed.
+TERMINATE_GRACE_SECONDS = 30
+
+# Manifest key -> environment variable; every tenant must set these so nothing leaks in from .env.
+CREDENTIAL_KEYS = {
+    "enrollware_username": "ENROLLWARE_USERNAME",
+    "enrollware_password": "ENROLLWARE_PASSWORD",
+    "auth_token": "AUTH_TOKEN",
+}
+
+
+def _expand(value):
+    """Expand ``${VAR}`` references so secrets can stay in the environment instead of the manifest."""
+    return os.path.expandvars(value) if isinstance(value, str) else value
+
+
+def load_manifest(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if not isinstance(manifest, dict):
+        raise ValueError(f"{path}: the manifest must be a JSON object")
+    tenants = manifest.get("tenants")
+    if not isinstance(tenants, list) or not tenants:
+        raise ValueError(f"{path}: 'tenants' must be a non-empty list")
+    names = set()
+    for tenant in tenants:
+        if not isinstance(tenant, dict):
+            raise ValueError(f"{path}: every tenant must be an object, got {tenant!r}")
+        name = str(tenant.get("name") or "")
+        if not re.fullmatch(r"[A-Za-z0-9_.-]+", name):
+            raise ValueError(f"{path}: tenant name {name!r} must be a non-empty slug (letters, digits, _ . -)")
+        if name in names:
+            raise ValueError(f"{path}: duplicate tenant name {name!r}")
+        names.add(name)
+        missing = [key for key in CREDENTIAL_KEYS if not _expand(tenant.get(key))]
+        if missing:
+            raise ValueError(f"{path}: tenant {name!r} is missing {', '.join(missing)}")
+    return manifest
+
+
+class TenantRunner:
+    """Launch and track tenant processes; shares the global caps between concurrent slots."""
+
+    def __init__(self, manifest: dict, output_root: str, main_args: List[str]) -> None:
+        self.manifest = manifest
+        self.output_root = output_root
+        self.main_args = main_args
+        self.max_browsers = max(1, int(manifest.get("max_browsers") or DEFAULT_MAX_BROWSERS))
+        self.max_api_concurrency = max(1, int(manifest.get("max_api_concurrency") or DEFAULT_MAX_API_CONCURRENCY))
+        self.max_api_rate = float(manifest["max_api_rate"]) if manifest.get("max_api_rate") else None
+        self.tuned = load_tuned_profile(os.path.join(RECORDS_DIR, "tuned_profile.json"))
+        self._processes: Dict[str, subprocess.Popen] = {}
+        self._lock = threading.Lock()
+
+    def tenant_env(self, tenant: dict, output_dir: str) -> Dict[str, str]:
+        env = os.environ.copy()
+        env.update({str(key): str(_expand(value)) for key, value in (tenant.get("env") or {}).items()})
+        for key, env_var in CREDENTIAL_KEYS.items():
+            env[env_var] = str(_expand(tenant[key]))
+        env["CHROME_PROFILE_DIR"] = os.path.join(output_dir, "chrome-profile")
+
+        # Each running slot gets an equal share of the global API caps.
+        concurrency_share = max(1, self.max_api_concurrency // self.max_browsers)
+        wanted = tenant.get("certification_concurrency") or self.tuned.get("certification_concurrency") or concurrency_share
+        env["CERTIFICATION_CONCURRENCY"] = str(min(int(wanted), concurrency_share))
+        rates = [float(tenant["api_rate_limit"])] if tenant.get("api_rate_limit") else []
+        if self.max_api_rate:
+            rates.append(self.max_api_rate / self.max_browsers)
+        if rates:
+            env["API_RATE_LIMIT"] = str(round(min(rates), 3))
+        if tenant.get("download_workers"):
+            env["DOWNLOAD_WORKERS"] = str(int(tenant["download_workers"]))
+        return env
+
+    def run_tenant(self, tenant: dict) -> dict:
+        name = tenant["name"]
+        output_dir = os.path.join(self.output_root, name)
+        os.makedirs(output_dir, exist_ok=True)
+        summary_path = os.path.join(output_dir, "run_summary.json")
+        if os.path.exists(summary_path):
+            os.remove(summary_path)
+        command = [sys.executable, MAIN_PATH, "--output-dir", output_dir, *self.main_args, *map(str, tenant.get("args") or [])]
+        env = self.tenant_env(tenant, output_dir)
+        logger.info(f"Starting tenant {name} (API concurrency {env['CERTIFICATION_CONCURRENCY']}, "
+                    f"rate limit {env.get('API_RATE_LIMIT', 'none')}/s)")
+        started = time.monotonic()
+        with open(os.path.join(output_dir, "run.log"), "a", encoding="utf-8") as log_file:
+            process = subprocess.Popen(command, env=env, stdout=log_file, stderr=subprocess.STDOUT)
+            with self._lock:
+                self._processes[name] = process
+            exit_code = process.wait()
+        with self._lock:
+            self._processes.pop(name, None)
+        elapsed = time.monotonic() - started
+
+        summary = {}
+        try:
+            with open(summary_path, "r", encoding="utf-8") as f:
+                summary = json.load(f)
+        except (OSError, ValueError):
+            logger.warning(f"Tenant {name} wrote no run summary; see {os.path.join(output_dir, 'run.log')}")
+        result = {"name": name, "exit_code": exit_code, "elapsed_seconds": round(elapsed, 1), "summary": summary}
+        logger.info(f"Tenant {name} finished in {elapsed / 60:.1f} min (exit {exit_code}, "
+                    f"{summary.get('records_per_minute', 0)} records/min)")
+        return result
+
+    def terminate_all(self) -> None:
+        with self._lock:
+            processes = list(self._processes.items())
+        for name, process in processes:
+            logger.warning(f"Stopping tenant {name}")
+            process.terminate()
+        deadline = time.monotonic() + TERMINATE_GRACE_SECONDS
+        for name, process in processes:
+            try:
+                process.wait(timeout=max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                logger.warning(f"Tenant {name} did not exit within {TERMINATE_GRACE_SECONDS}s; killing it")
+                process.kill()
+
+    def run(self, tenants: List[dict]) -> List[dict]:
+        with ThreadPoolExecutor(max_workers=min(self.max_browsers, len(tenants))) as executor:
+            futures = [executor.submit(self.run_tenant, tenant) for tenant in tenants]
+            try:
+                return [future.result() for future in futures]
+            except KeyboardInterrupt:
+                for future in futures:
+                    future.cancel()
+                self.terminate_all()
+                raise
+
+
+def build_report(results: List[dict], runner: TenantRunner, wall_seconds: float) -> dict:
+    statuses = Counter()
+    for result in results:
+        statuses.update(result["summary"].get("statuses") or {})
+    synced = statuses["done"] + statuses["logged"]
+    return {
+        "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "wall_seconds": round(wall_seconds, 1),
+        "max_browsers": runner.max_browsers,
+        "max_api_concurrency": runner.max_api_concurrency,
+        "max_api_rate": runner.max_api_rate,
+        "tenants": results,
+        "totals": {
+            "statuses": dict(statuses),
+            "records_per_minute": round(synced * 60 / wall_seconds, 2) if wall_seconds > 0 else 0.0,
+            "failed_tenants": [
+                result["name"] for result in results
+                if result["exit_code"] != 0 or not result["summary"].get("completed")
+            ],
+        },
+    }
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run main.py for several tenants in parallel.")
+    parser.add_argument("manifest", help="tenant manifest JSON")
+    parser.add_argument("--only", nargs="*", metavar="NAME", help="run only these tenants")
+    parser.add_argument("--output-root", default=None, metavar="DIR",
+                        help="parent of the per-tenant output directories (default: manifest output_root or Instructor records/tenants)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    try:
+        manifest = load_manifest(args.manifest)
+    except (OSError, ValueError) as e:
+        logger.error(f"Invalid tenant manifest: {e}")
+        return 2
+    tenants = [tenant for tenant in manifest["tenants"] if not args.only or tenant["name"] in args.only]
+    if not tenants:
+        logger.error(f"No tenants in {args.manifest} match {args.only}")
+        return 2
+    output_root = args.output_root or _expand(manifest.get("output_root")) or DEFAULT_OUTPUT_ROOT
+    os.makedirs(output_root, exist_ok=True)
+    runner = TenantRunner(manifest, output_root, [str(arg) for arg in manifest.get("main_args") or []])
+
+    started = time.monotonic()
+    try:
+        results = runner.run(tenants)
+    except KeyboardInterrupt:
+        logger.warning("Interrupted; tenant processes were stopped")
+        return 130
+    report = build_report(results, runner, time.monotonic() - started)
+    report_path = os.path.join(output_root, "orchestrator_report.json")
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    for result in results:
+        summary = result["summary"]
+        logger.info(f"{result['name']:20s} exit {result['exit_code']:>3}  {result['elapsed_seconds'] / 60:6.1f} min  "
+                    f"{summary.get('records_per_minute', 0):7.2f} rec/min  {summary.get('statuses', {})}")
+    totals = report["totals"]
+    logger.info(f"Total: {totals['records_per_minute']} records/min across {len(results)} tenant(s); report saved to {report_path}")
+    if totals["failed_tenants"]:
+        logger.error(f"Tenants that did not complete: {', '.join(totals['failed_tenants'])}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    configure_logging(logging.INFO)
+    sys.exit(main())
@@ -0,0 +1,268 @@
+"""Microbenchmarks for the pure helpers in automation/Utils/functions.py.
+
+Usage (from project root):
+
+    python benchmarks/bench_functions.py --size small --save-baseline
+    python benchmarks/bench_functions.py --size small            # compare against baseline
+
+Exits with status 1 when a benchmark's throughput drops, or its peak allocation grows,
+by more than the allowed threshold compared to the saved baseline.
+"""
+import os
+import sys
+import json
+import time
+import random
+import string
+import argparse
+import platform
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "automation"))
+
+from Utils.functions import (  # noqa: E402
+    clean_username, get_best_match_id, instructor_is_valid, extract_instructors_list,
+    extract_document_filenames, extract_response_message
+)
+
+SIZES = {"small": 10_000, "medium": 100_000, "large": 1_000_000}
+# Ignore allocation "regressions" smaller than this; tiny peaks are dominated by interpreter noise.
+MIN_ALLOC_GROWTH_BYTES = 4096
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+FIRST_NAMES = ["James", "Maria", "Nickesha", "Joseph", "Aisha", "Chen", "Olga", "Zacharias", "Liam", "Fatima"]
+LAST_NAMES = ["Smith", "Williams-Patterson", "Garcia", "Nguyen", "O'Brien", "Johnson", "Kowalski", "Shell"]
+STATUS_SUFFIXES = [
+    "", " **Monitoring Complete**", " (Complete and sent to Nathan)", " Needs Monitoring",
+    " CODEBLUE CPR CLASSES", " Completed with Nathan Shell", " sent to Nathan",
+]
+REQUIRED_FIELDS = [
+    "username", "training_site_id", "country_id", "password", "email", "first_name",
+    "last_name", "city", "address_line_1", "zip_postal_code", "state_province_region",
+]
+
+
+def _word(rng: random.Random, length: int = 8) -> str:
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(length))
+
+
+def make_name_entries(n: int, rng: random.Random) -> List[str]:
+    entries = []
+    for _ in range(n):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        name = f"{last}, {first}" if rng.random() < 0.6 else f"{first} {last}"
+        entries.append(name + rng.choice(STATUS_SUFFIXES))
+    return entries
+
+
+def make_documents(n: int, rng: random.Random) -> List[dict]:
+    documents = []
+    for i in range(n):
+        extension = rng.choice(["pdf", "jpg", "png", "docx"])
+        documents.append({
+            "id": i,
+            "document_path": f"uploads/instructors/{rng.randint(1, 9999)}/{_word(rng)}_{i}.{extension}",
+        })
+        if rng.random() < 0.02:
+            documents.append({"id": i, "document_path": None})
+    return documents
+
+
+def make_instructor_entries(n: int, rng: random.Random) -> List[dict]:
+    return [
+        {
+            "id": i,
+            "email": f"{_word(rng, 6)}.{i}@example.com",
+            "username": _word(rng, 10),
+            "documents": make_documents(rng.randint(0, 3), rng),
+        }
+        for i in range(n)
+    ]
+
+
+def make_payloads(n: int, rng: random.Random) -> List[dict]:
+    payloads = []
+    for _ in range(n):
+        payload = {field: _word(rng, 6) for field in REQUIRED_FIELDS}
+        for field in rng.sample(REQUIRED_FIELDS, rng.randint(0, 2)):
+            payload[field] = rng.choice(["", "  ", None])
+        payloads.append(payload)
+    return payloads
+
+
+def make_training_sites(n: int, rng: random.Random) -> dict:
+    return {"data": [
+        {"id": i, "company_name": f"TS{rng.randint(10000, 99999)} {_word(rng).title()} CPR Services, LLC"}
+        for i in range(n)
+    ]}
+
+
+def make_responses(n: int, rng: random.Random) -> List[dict]:
+    shapes = [
+        lambda: {"message": "The username has already been taken."},
+        lambda: {"data": {"message": "Created"}},
+        lambda: {"data": [1, 2, 3]},
+        lambda: {"status": "ok"},
+    ]
+    return [rng.choice(shapes)() for _ in range(n)]
+
+
+def build_benchmarks(n: int, seed: int) -> Dict[str, Tuple[Callable[[], None], int]]:
+    """Return name -> (workload, items processed per workload call)."""
+    rng = random.Random(seed)
+    names = make_name_entries(n, rng)
+    instructors_response = {"data": {"data": make_instructor_entries(n, rng)}}
+    documents = make_documents(n, rng)
+    payloads = make_payloads(n, rng)
+    responses = make_responses(n, rng)
+    # difflib matching is O(sites) per lookup; keep the site list realistic and scale lookups instead.
+    sites = make_training_sites(min(max(n // 100, 50), 2000), rng)
+    site_targets = [site["company_name"][:-5] for site in rng.sample(sites["data"], 20)]
+
+    def run_clean_username():
+        for entry in names:
+            clean_username(entry)
+
+    def run_instructor_is_valid():
+        for payload in payloads:
+            instructor_is_valid(payload)
+
+    def run_extract_instructors_list():
+        for entry in extract_instructors_list(instructors_response):
+            entry.get("email")
+
+    def run_extract_document_filenames():
+        extract_document_filenames(documents)
+
+    def run_extract_response_message():
+        for response in responses:
+            extract_response_message(response)
+
+    def run_get_best_match_id():
+        for target in site_targets:
+            get_best_match_id(sites, target)
+
+    return {
+        "clean_username": (run_clean_username, len(names)),
+        "instructor_is_valid": (run_instructor_is_valid, len(payloads)),
+        "extract_instructors_list": (run_extract_instructors_list, n),
+        "extract_document_filenames": (run_extract_document_filenames, len(documents)),
+        "extract_response_message": (run_extract_response_message, len(responses)),
+        "get_best_match_id": (run_get_best_match_id, len(site_targets)),
+    }
+
+
+def _calibrate_loops(workload: Callable[[], None], min_seconds: float) -> int:
+    """Number of workload calls per timing so one sample lasts at least ``min_seconds``."""
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            workload()
+        if time.perf_counter() - started >= min_seconds or loops >= 1_000_000:
+            return loops
+        loops *= 2
+
+
+def measure(workload: Callable[[], None], items: int, repeats: int, min_seconds: float = 0.2) -> dict:
+    loops = _calibrate_loops(workload, min_seconds)
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _ in range(loops):
+            workload()
+        timings.append((time.perf_counter() - started) / loops)
+    best = min(timings)
+
+    tracemalloc.start()
+    workload()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "items": items,
+        "best_seconds": round(best, 6),
+        "items_per_second": round(items / best, 1) if best > 0 else 0.0,
+        "peak_alloc_bytes": peak,
+    }
+
+
+def compare(results: dict, baseline: dict, max_slowdown: float, max_alloc_growth: float) -> List[str]:
+    """Return human-readable regression messages (empty when everything is within limits)."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if previous["items"] != current["items"]:
+            print(f"  {name}: baseline used a different size, skipping comparison")
+            continue
+        throughput_ratio = current["items_per_second"] / previous["items_per_second"] if previous["items_per_second"] else 1.0
+        alloc_ratio = current["peak_alloc_bytes"] / previous["peak_alloc_bytes"] if previous["peak_alloc_bytes"] else 1.0
+        print(f"  {name}: throughput x{throughput_ratio:.2f}, peak alloc x{alloc_ratio:.2f}")
+        if throughput_ratio < 1.0 - max_slowdown:
+            regressions.append(f"{name}: throughput fell to {throughput_ratio:.0%} of baseline")
+        alloc_growth = current["peak_alloc_bytes"] - previous["peak_alloc_bytes"]
+        if alloc_ratio > 1.0 + max_alloc_growth and alloc_growth > MIN_ALLOC_GROWTH_BYTES:
+            regressions.append(f"{name}: peak allocation grew to {alloc_ratio:.0%} of baseline")
+    return regressions
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the pure helpers in Utils/functions.py.")
+    parser.add_argument("--size", choices=sorted(SIZES), default="small", help="synthetic dataset size")
+    parser.add_argument("--repeats", type=int, default=5, help="timing repeats per benchmark (best is kept)")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--only", nargs="*", help="run only these benchmarks")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON path")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--max-slowdown", type=float, default=0.20, help="allowed throughput drop (0.20 = 20%%)")
+    parser.add_argument("--max-alloc-growth", type=float, default=0.20, help="allowed peak allocation growth")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    n = SIZES[args.size]
+    print(f"Building {args.size} datasets ({n} records)...")
+    benchmarks = build_benchmarks(n, args.seed)
+    if args.only:
+        benchmarks = {name: bench for name, bench in benchmarks.items() if name in args.only}
+
+    results = {}
+    for name, (workload, items) in benchmarks.items():
+        results[name] = measure(workload, items, args.repeats)
+        result = results[name]
+        print(f"{name:28s} {result['items_per_second']:>14,.0f} items/s  "
+              f"{result['best_seconds']:.4f}s  peak {result['peak_alloc_bytes'] / 1024:,.0f} KiB")
+
+    baseline_doc = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline_doc = json.load(f)
+
+    if args.save_baseline:
+        baseline_doc[args.size] = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": {**baseline_doc.get(args.size, {}).get("results", {}), **results},
+        }
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline_doc, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    baseline = baseline_doc.get(args.size, {}).get("results")
+    if not baseline:
+        print(f"No {args.size} baseline in {args.baseline}; run with --save-baseline first.")
+        return 0
+    print("Comparison against baseline:")
+    regressions = compare(results, baseline, args.max_slowdown, args.max_alloc_growth)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""Tests for the certification table mapping in automation/Utils/functions.py.
+
+Run from project root:
+
+    python -m pytest -q tests
+"""
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "automation"))
+
+from Utils.functions import certification_key, map_certification_rows  # noqa: E402
+
+
+def test_card_number_and_valid_until():
+    rows = map_certification_rows(["Course", "Valid Until", "Card Number"], [["BLS Provider", "12/2026", "A1B2C3"]])
+    assert rows == [{"certification_name": "BLS Provider", "expiration_date": "12/2026", "certification_number": "A1B2C3"}]
+
+
+def test_provider_column_is_not_a_number():
+    headers = ["Discipline", "Provider", "Issue Date", "Expiration Date"]
+    rows = map_certification_rows(headers, [["ACLS", "AHA", "01/2024", "01/2026"]])
+    assert rows == [{"certification_name": "ACLS", "issue_date": "01/2024", "expiration_date": "01/2026"}]
+
+
+def test_number_and_date_headers_win_over_name_words():
+    headers = ["Certification Number", "Course", "Card Expiration"]
+    rows = map_certification_rows(headers, [["12345", "PALS", "03/2027"]])
+    assert rows == [{"certification_number": "12345", "certification_name": "PALS", "expiration_date": "03/2027"}]
+
+
+def test_type_and_id_headers_are_ignored():
+    rows = map_certification_rows(["Type", "ID", "Course"], [["Instructor", "77", "BLS"]])
+    assert rows == [{"certification_name": "BLS"}]
+
+
+def test_rows_without_a_name_column_or_value_are_dropped():
+    assert map_certification_rows(["Card #", "Expires"], [["1", "2026"]]) == []
+    assert map_certification_rows(["Course", "Card #"], [["", "1"], ["BLS"]]) == [
+        {"certification_name": "BLS", "certification_number": ""}
+    ]
+
+
+def test_certification_key_matches_api_and_page_shapes():
+    page = map_certification_rows(["Course", "Card #"], [[" BLS Provider ", "AB12"]])[0]
+    remote = {"name": "bls provider", "number": "ab12", "id": 9}
+    assert certification_key(page) == certification_key(remote) == ("bls provider", "ab12")
+
+
+def test_misread_expiry_no_longer_changes_the_key():
+    page = map_certification_rows(["Course", "Valid Until", "Card Number"], [["BLS", "12/2026", "C9"]])[0]
+    assert certification_key(page) == ("bls", "c9")